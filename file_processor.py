@@ -1,5 +1,5 @@
-from PyPDF2 import PdfReader
 from docx import Document
+import pymupdf
 import pytesseract
 from PIL import Image
 import io
@@ -7,12 +7,12 @@ import io
 
 def extract_text_from_pdf(file_content: bytes) -> str:
     try:
-        pdf_reader = PdfReader(io.BytesIO(file_content))
-        text_parts = []
-        for page in pdf_reader.pages:
-            text = page.extract_text()
-            if text:
-                text_parts.append(text)
+        with pymupdf.open(stream=file_content, filetype="pdf") as doc:
+            text_parts = []
+            for page in doc:
+                text = page.get_text()
+                if text:
+                    text_parts.append(text)
         return "\n".join(text_parts)
     except Exception as e:
         raise ValueError(f"Failed to extract text from PDF: {str(e)}")
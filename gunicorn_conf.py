@@ -0,0 +1,25 @@
+# Gunicorn configuration for the services gateway
+# Run with: gunicorn -c gunicorn_conf.py
+#
+# Nearly every request spends its time waiting on Gemini over HTTPS, so we use
+# gevent workers: each worker multiplexes many in-flight requests on greenlets
+# instead of tying up one OS thread per request. The gevent worker calls
+# gevent.monkey.patch_all() itself when it boots, before the app is imported.
+import multiprocessing
+import os
+
+chdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services')
+wsgi_app = 'gateway.app:app'
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = 'gevent'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_connections = 1000
+timeout = 120
+
+
+def post_fork(server, worker):
+    # psycopg2 talks to PostgreSQL from C, out of reach of the monkey-patching, so
+    # without this every query would stall all of the worker's greenlets
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
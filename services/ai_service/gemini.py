@@ -1,15 +1,101 @@
 import google.generativeai as genai
+from google.generativeai.client import get_default_generative_client
+from datetime import datetime
+from functools import partial, wraps
+import hashlib
+import inspect
 import json
 import os
 import re
+import threading
 from typing import Dict, List, Any
 
+import orjson
+import redis
+from cachetools import TTLCache, cached
+from requests.adapters import HTTPAdapter
+
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 if gemini_api_key:
-    genai.configure(api_key=gemini_api_key)
+    # REST goes through plain sockets, which the gevent workers patch, so a request
+    # waiting on Gemini yields to others. The default gRPC transport would block the
+    # whole worker for the duration of every call.
+    genai.configure(api_key=gemini_api_key, transport='rest')
+    
+    # The REST client keeps a single requests session for the process, but its
+    # adapter only keeps 10 idle connections; under load the rest are closed after
+    # each call and the next one pays a fresh TLS handshake.
+    _session = getattr(getattr(get_default_generative_client(), '_transport', None), '_session', None)
+    if _session is not None:
+        _pool_size = int(os.getenv("GEMINI_POOL_SIZE", "100"))
+        _session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=_pool_size))
 
 model = genai.GenerativeModel('gemini-2.0-flash-exp')
 
+# Bump whenever a prompt or the shape of a parsed result changes, so answers
+# cached under the old prompts are never served again.
+PROMPT_VERSION = 'v1'
+AI_CACHE_TTL = 7 * 24 * 60 * 60
+
+_redis_url = os.getenv("REDIS_URL")
+_ai_cache_redis = redis.Redis.from_url(_redis_url) if _redis_url else None
+_ai_cache_local = TTLCache(maxsize=1024, ttl=AI_CACHE_TTL)
+_ai_cache_lock = threading.Lock()
+
+
+def content_cache_key(fn_name: str, *inputs) -> str:
+    payload = orjson.dumps(inputs, option=orjson.OPT_SORT_KEYS)
+    return f"{PROMPT_VERSION}:{fn_name}:{hashlib.sha256(payload).hexdigest()}"
+
+
+def _ai_cache_get(key: str):
+    if _ai_cache_redis is not None:
+        try:
+            return _ai_cache_redis.get(key)
+        except redis.RedisError:
+            return None
+    with _ai_cache_lock:
+        return _ai_cache_local.get(key)
+
+
+def _ai_cache_set(key: str, value: bytes) -> None:
+    if _ai_cache_redis is not None:
+        try:
+            _ai_cache_redis.set(key, value, ex=AI_CACHE_TTL)
+        except redis.RedisError:
+            pass
+        return
+    with _ai_cache_lock:
+        _ai_cache_local[key] = value
+
+
+def content_cached(func=None, *, cacheable=None):
+    """Serve repeated calls with identical inputs from the cache instead of Gemini.
+
+    Results are shared across users and workers through Redis when it is
+    configured, and stored serialized so callers never share a mutable result.
+    Arguments are keyed by parameter, so positional and keyword calls share
+    entries. A result for which `cacheable` returns False, such as a degraded
+    fallback, is returned without being stored.
+    """
+    if func is None:
+        return partial(content_cached, cacheable=cacheable)
+    signature = inspect.signature(func)
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = content_cache_key(func.__name__, *bound.arguments.values())
+        hit = _ai_cache_get(key)
+        if hit is not None:
+            return orjson.loads(hit)
+        result = func(*args, **kwargs)
+        if cacheable is None or cacheable(result):
+            _ai_cache_set(key, orjson.dumps(result))
+        return result
+    return wrapper
+
 
 def clean_json_response(text: str) -> str:
     """Clean AI response to extract valid JSON."""
@@ -43,9 +129,12 @@ def clean_json_response(text: str) -> str:
 
 
 def analyze_resume(resume_text: str) -> Dict[str, Any]:
-    from datetime import datetime
-    current_year = datetime.now().year
-    
+    # The prompt depends on the year, so it is part of the cache key
+    return _analyze_resume(resume_text, datetime.now().year)
+
+
+@content_cached
+def _analyze_resume(resume_text: str, current_year: int) -> Dict[str, Any]:
     prompt = f"""You are a brutally honest resume expert and career coach. Act as a recruiter reviewing this resume - be direct about weaknesses.
 
 IMPORTANT: The current year is {current_year}. When calculating years of experience:
@@ -101,6 +190,7 @@ Return ONLY valid JSON with this exact structure:
         raise ValueError(f"Failed to analyze resume: {str(e)}")
 
 
+@content_cached
 def analyze_job_match(resume_text: str, job_description: str) -> Dict[str, Any]:
     prompt = f"""You are an expert career coach. Analyze how well this resume aligns with the job description.
 
@@ -135,6 +225,16 @@ Return ONLY valid JSON:
         raise ValueError(f"Failed to analyze job match: {str(e)}")
 
 
+# Curated (role, location) pairs are low-cardinality and yield near-identical
+# descriptions, so one Gemini call per pair per day is plenty.
+_job_description_cache = TTLCache(maxsize=512, ttl=86400)
+
+
+def job_description_key(role: str, location: str) -> tuple:
+    return (role.strip().lower(), location.strip().lower())
+
+
+@cached(_job_description_cache, key=job_description_key, lock=threading.Lock())
 def generate_job_description(role: str, location: str) -> str:
     prompt = f"""Generate a realistic job description for a {role} position in {location}.
 
@@ -154,6 +254,7 @@ Respond with just the job description text, no JSON."""
         raise ValueError(f"Failed to generate job description: {str(e)}")
 
 
+@content_cached
 def generate_final_verdict(
     resume_text: str,
     job_description: str,
@@ -200,6 +301,8 @@ Return ONLY valid JSON:
         raise ValueError(f"Failed to generate verdict: {str(e)}")
 
 
+# A reply that wasn't valid JSON falls back to the raw text; retry it next time
+@content_cached(cacheable=lambda result: 'resumeJson' in result)
 def generate_tailored_resume(
     original_resume_text: str,
     job_description: str,
@@ -337,6 +440,7 @@ Include ALL original sections. Return ONLY valid JSON."""
         raise ValueError(f"Failed to generate tailored resume: {str(e)}")
 
 
+@content_cached
 def generate_career_roadmap(
     resume_text: str,
     dream_role: str,
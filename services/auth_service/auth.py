@@ -1,18 +1,27 @@
 import bcrypt
+from gevent import get_hub, monkey
 from typing import Optional
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
+
+def _off_hub(func, *args):
+    """Run CPU-bound bcrypt work where it won't stall other requests.
+    
+    Under the gevent workers, patched threads are greenlets sharing one OS thread,
+    so the work goes to gevent's native threadpool and the hub keeps serving.
+    """
+    if monkey.is_module_patched('threading'):
+        return get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+
+def _hashpw(password: str) -> str:
     return bcrypt.hashpw(
         password.encode("utf-8"), 
         bcrypt.gensalt()
     ).decode("utf-8")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    if not hashed_password:
-        return False
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     try:
         return bcrypt.checkpw(
             plain_password.encode("utf-8"), 
@@ -20,3 +29,21 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         )
     except Exception:
         return False
+
+
+def hash_password(password: str) -> str:
+    """Hash a password using bcrypt."""
+    return _off_hub(_hashpw, password)
+
+
+# Checked against when there is no stored hash, so unknown usernames take as
+# long to reject as wrong passwords
+_DUMMY_HASH = _hashpw("resumatch-dummy-password")
+
+
+def verify_password(plain_password: str, hashed_password: Optional[str]) -> bool:
+    """Verify a password against its hash."""
+    if not hashed_password:
+        _off_hub(_checkpw, plain_password, _DUMMY_HASH)
+        return False
+    return _off_hub(_checkpw, plain_password, hashed_password)
@@ -1,57 +1,159 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file
+from flask import Flask, Response, make_response, render_template, request, redirect, url_for, session, flash, send_file, current_app
+from flask_caching import Cache
+from flask_compress import Compress
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.routing import UUIDConverter
+from dataclasses import dataclass
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import delete, event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager, undefer
+from datetime import datetime, timedelta
+import hashlib
+import logging
 import os
 import sys
-import json
+import tempfile
+import time
+import orjson
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from shared.models import db, User, Resume, Analysis, JobMatch, CareerRoadmap
+from shared.models import db, generate_uuid, User, Resume, Analysis, JobMatch, CareerRoadmap, CuratedJob
 from shared.config import Config
 from auth_service.auth import hash_password, verify_password
-from resume_service.file_processor import extract_text_from_file, get_mime_type
+from resume_service.file_processor import get_mime_type, spool_upload
+from gateway.tasks import submit_extraction, submit_analysis, submit_roadmap, is_stale, fail_stale, STALE_JOB_MESSAGE
+from gateway.pdf import PDF_POOL, build_tailored_pdf_offloaded, write_tailored_pdf, tailored_pdf_etag
 from ai_service.gemini import (
-    analyze_resume,
     analyze_job_match,
     generate_job_description,
+    job_description_key,
     generate_final_verdict,
-    generate_tailored_resume,
-    generate_career_roadmap
+    generate_tailored_resume
 )
 
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT
-from reportlab.lib import colors
-import io
-import re
+
+cache = Cache()
+compress = Compress()
+limiter = Limiter(key_func=get_remote_address)
+
+
+class IdConverter(UUIDConverter):
+    """Match a UUID path segment but keep it the string the id columns take.
+
+    Ids are native UUIDs in PostgreSQL, so a malformed one would fail the query;
+    this turns it into a 404 at routing instead.
+    """
+    def to_python(self, value):
+        return value
 
 
 def create_app():
     app = Flask(__name__, template_folder='templates', static_folder='static')
+    app.url_map.converters['id'] = IdConverter
+    if Config.TRUSTED_PROXIES:
+        # Rate limits key on the client address, which the proxies put in X-Forwarded-For
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXIES)
+    # Compiled templates are shared through the bytecode cache, so restarted and
+    # newly forked workers skip parsing and compiling them
+    os.makedirs(Config.JINJA_CACHE_DIR, exist_ok=True)
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(Config.JINJA_CACHE_DIR)}
     app.config['SECRET_KEY'] = Config.SECRET_KEY
     app.config['SQLALCHEMY_DATABASE_URI'] = Config.DATABASE_URL
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['MAX_CONTENT_LENGTH'] = Config.MAX_UPLOAD_SIZE
+    app.config['COMPRESS_MIMETYPES'] = ['text/html', 'application/json']
+    app.config['RATELIMIT_STORAGE_URI'] = Config.REDIS_URL or 'memory://'
     app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
-        'pool_size': 5,
-        'max_overflow': 10,
+        # Gemini-bound routes release their connection during the call (see release_db_connection)
+        'pool_size': 10,
+        'max_overflow': 20,
+        # Fail fast with an error page instead of queueing a request behind an exhausted pool
+        'pool_timeout': 10,
+        # Room for every distinct statement shape the routes emit, so none are recompiled
+        'query_cache_size': 1200,
     }
     
     db.init_app(app)
+    compress.init_app(app)
+    limiter.init_app(app)
+    if Config.REDIS_URL:
+        cache.init_app(app, config={'CACHE_TYPE': 'RedisCache', 'CACHE_REDIS_URL': Config.REDIS_URL})
+    else:
+        cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache'})
     
     with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _start_query_timer)
+        event.listen(db.engine, 'after_cursor_execute', _log_slow_query)
         db.create_all()
     
+    # Load every template up front so the first request to each page doesn't pay for it.
+    # Their sources also version page ETags, so a deploy invalidates cached pages.
+    templates_digest = hashlib.md5()
+    for template_name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(template_name)
+        templates_digest.update(app.jinja_env.loader.get_source(app.jinja_env, template_name)[0].encode('utf-8'))
+    app.config['TEMPLATES_VERSION'] = templates_digest.hexdigest()
+    
     return app
 
 
+slow_query_logger = logging.getLogger(__name__)
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info['query_start'].pop()) * 1000
+    if elapsed_ms >= Config.SLOW_QUERY_MS:
+        slow_query_logger.warning('Slow query (%.0f ms): %s', elapsed_ms, statement)
+
+
 app = create_app()
 
 
+def ojson(payload, status=200):
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+
+def render_page(template_name, etag_source, **context):
+    """Render a user's page, or answer 304 when their cached copy came from the same data.
+    
+    etag_source must capture everything the page shows besides the user and templates.
+    Rendered pages are also kept server-side under their ETag, so a revisit from
+    another browser or after a cache clear skips rendering too.
+    """
+    etag = hashlib.md5(repr((
+        current_app.config['TEMPLATES_VERSION'], session.get('user_id'), session.get('username'), etag_source
+    )).encode('utf-8')).hexdigest()
+    # Pending flash messages are only consumed by rendering, so never skip it then. The
+    # page carries a one-off message, so it gets no ETag a later visit could revalidate
+    if '_flashes' in session:
+        response = make_response(render_template(template_name, **context))
+    elif request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+    else:
+        page_key = f'page:{request.endpoint}:{etag}'
+        body = cache.get(page_key)
+        if body is None:
+            body = render_template(template_name, **context)
+            cache.set(page_key, body, timeout=Config.PAGE_CACHE_TTL)
+        response = make_response(body)
+        response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -62,10 +164,101 @@ def login_required(f):
     return decorated_function
 
 
+@dataclass(frozen=True)
+class CurrentUser:
+    """The logged-in user as carried in the signed session cookie."""
+    id: str
+    username: str
+
+
+def log_in(user_id, username):
+    session['user_id'] = user_id
+    session['username'] = username
+
+
 def get_current_user():
-    if 'user_id' in session:
-        return User.query.get(session['user_id'])
-    return None
+    if 'user_id' not in session:
+        return None
+    if 'username' not in session:
+        # Sessions issued before the username was stored; fill it in once
+        user = db.session.get(User, session['user_id'])
+        if user is None:
+            return None
+        session['username'] = user.username
+    return CurrentUser(id=session['user_id'], username=session['username'])
+
+
+def fetch_owned(model, obj_id, user_id):
+    """Load a resume-scoped record and its resume in one query, only if the user owns it."""
+    return db.session.execute(
+        select(model).join(Resume, model.resume_id == Resume.id).options(
+            contains_eager(model.resume)
+        ).where(
+            model.id == obj_id,
+            Resume.user_id == user_id
+        )
+    ).scalar_one_or_none()
+
+
+def latest_ready_resume(user_id):
+    # Callers send the text to Gemini after releasing the session, so legacy rows'
+    # inline text is loaded up front; load_text can't fetch it once detached
+    return db.session.execute(
+        select(Resume).options(undefer(Resume.extracted_text)).where(
+            Resume.user_id == user_id,
+            Resume.status == 'ready'
+        ).order_by(Resume.created_at.desc()).limit(1)
+    ).scalar_one_or_none()
+
+
+# Listing pages only show metadata; skip the large text/JSON columns
+RESUME_LIST_COLUMNS = (Resume.id, Resume.filename, Resume.filesize, Resume.mime_type,
+                       Resume.status, Resume.error_message, Resume.created_at)
+ROADMAP_LIST_COLUMNS = (CareerRoadmap.id, CareerRoadmap.dream_role, CareerRoadmap.dream_location,
+                        CareerRoadmap.timeframe, CareerRoadmap.created_at)
+# Id of an analysis of each listed resume, so the dashboard needs no follow-up query
+RESUME_ANALYSIS_ID = select(Analysis.id).where(
+    Analysis.resume_id == Resume.id
+).limit(1).correlate(Resume).scalar_subquery().label('analysis_id')
+
+
+def release_db_connection():
+    """Hand the request's connection back to the pool before a long Gemini call.
+
+    Loaded objects stay readable but become detached; add back any that are
+    modified afterwards so the next commit writes them.
+    """
+    db.session.close()
+
+
+def list_resumes(user_id, *extra_columns):
+    return db.session.query(*RESUME_LIST_COLUMNS, *extra_columns).filter_by(user_id=user_id).order_by(
+        Resume.created_at.desc()
+    ).all()
+
+
+def get_curated_job_description(role, location):
+    """Return a generated job description for a curated role, reusing stored ones."""
+    role_key, location_key = job_description_key(role, location)
+    curated = CuratedJob.query.filter_by(role_key=role_key, location_key=location_key).first()
+    fresh_after = datetime.utcnow() - timedelta(seconds=Config.CURATED_JOB_TTL)
+    if curated and curated.created_at >= fresh_after:
+        return curated.job_description
+    
+    release_db_connection()
+    job_description = generate_job_description(role, location)
+    try:
+        if curated:
+            db.session.add(curated)
+            curated.job_description = job_description
+            curated.created_at = datetime.utcnow()
+        else:
+            db.session.add(CuratedJob(role_key=role_key, location_key=location_key,
+                                      job_description=job_description))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+    return job_description
 
 
 @app.route('/')
@@ -75,7 +268,14 @@ def index():
     return render_template('index.html')
 
 
+def login_attempt_key():
+    # The username is normalized the way login() looks it up. Keying on the client
+    # too means a stranger's bad guesses can't lock the account's owner out
+    return f"{get_remote_address()}:{request.form.get('username', '').strip()}"
+
+
 @app.route('/register', methods=['GET', 'POST'])
+@limiter.limit(Config.AUTH_RATE_LIMIT, methods=['POST'])
 def register():
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
@@ -86,6 +286,10 @@ def register():
             flash('Username and password are required.', 'error')
             return render_template('register.html')
         
+        if len(username) > Config.MAX_USERNAME_LENGTH:
+            flash(f'Username must be at most {Config.MAX_USERNAME_LENGTH} characters.', 'error')
+            return render_template('register.html')
+        
         if password != confirm_password:
             flash('Passwords do not match.', 'error')
             return render_template('register.html')
@@ -99,11 +303,12 @@ def register():
             flash('Username already exists.', 'error')
             return render_template('register.html')
         
-        user = User(username=username, password_hash=hash_password(password))
+        user_id = generate_uuid()
+        user = User(id=user_id, username=username, password_hash=hash_password(password))
         db.session.add(user)
         db.session.commit()
         
-        session['user_id'] = user.id
+        log_in(user_id, username)
         flash('Account created successfully!', 'success')
         return redirect(url_for('dashboard'))
     
@@ -111,6 +316,9 @@ def register():
 
 
 @app.route('/login', methods=['GET', 'POST'])
+@limiter.limit(Config.AUTH_RATE_LIMIT, methods=['POST'])
+# Tighter per account and client, so one client can't spend its whole budget on one account
+@limiter.limit(Config.LOGIN_ATTEMPT_RATE_LIMIT, methods=['POST'], key_func=login_attempt_key)
 def login():
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
@@ -118,8 +326,10 @@ def login():
         
         user = User.query.filter_by(username=username).first()
         
-        if user and verify_password(password, user.password_hash):
-            session['user_id'] = user.id
+        # Always run the hash check so response time doesn't reveal whether the username exists
+        password_ok = verify_password(password, user.password_hash if user else None)
+        if user and password_ok:
+            log_in(user.id, user.username)
             flash('Logged in successfully!', 'success')
             return redirect(url_for('dashboard'))
         
@@ -131,6 +341,7 @@ def login():
 @app.route('/logout')
 def logout():
     session.pop('user_id', None)
+    session.pop('username', None)
     flash('Logged out successfully.', 'success')
     return redirect(url_for('index'))
 
@@ -139,13 +350,14 @@ def logout():
 @login_required
 def dashboard():
     user = get_current_user()
-    resumes = Resume.query.filter_by(user_id=user.id).order_by(Resume.created_at.desc()).all()
+    resumes = list_resumes(user.id, RESUME_ANALYSIS_ID)
+    # The page reloads while a resume is processing; stop if its extraction was lost
+    if any(is_stale(resume.status, resume.created_at) for resume in resumes):
+        fail_stale(Resume, Resume.user_id == user.id)
+        resumes = list_resumes(user.id, RESUME_ANALYSIS_ID)
     latest_resume = resumes[0] if resumes else None
-    latest_analysis = None
-    if latest_resume:
-        latest_analysis = Analysis.query.filter_by(resume_id=latest_resume.id).first()
-    return render_template('dashboard.html', user=user, resumes=resumes, 
-                         latest_resume=latest_resume, latest_analysis=latest_analysis)
+    return render_page('dashboard.html', resumes, user=user, resumes=resumes, 
+                       latest_resume=latest_resume)
 
 
 @app.route('/upload-resume', methods=['POST'])
@@ -167,25 +379,42 @@ def upload_resume():
         return redirect(url_for('dashboard'))
     
     try:
-        file_content = file.read()
+        upload, filesize, file_hash = spool_upload(file.stream)
         mime_type = get_mime_type(file.filename)
-        extracted_text = extract_text_from_file(file_content, mime_type)
         
-        if not extracted_text or len(extracted_text.strip()) < 50:
-            flash('Could not extract sufficient text from the file.', 'error')
-            return redirect(url_for('dashboard'))
+        # A byte-identical re-upload reuses the text already extracted from it
+        previous = db.session.execute(
+            select(Resume.text_path, Resume.extracted_text, Resume.text_hash).where(
+                Resume.user_id == user.id,
+                Resume.file_hash == file_hash,
+                Resume.status == 'ready'
+            ).limit(1)
+        ).first()
         
+        resume_id = generate_uuid()
         resume = Resume(
+            id=resume_id,
             user_id=user.id,
             filename=file.filename,
-            filesize=len(file_content),
+            filesize=filesize,
             mime_type=mime_type,
-            extracted_text=extracted_text
+            file_hash=file_hash,
+            text_path=previous.text_path if previous else None,
+            extracted_text=previous.extracted_text if previous else None,
+            text_hash=previous.text_hash if previous else None,
+            status='ready' if previous else 'processing'
         )
         db.session.add(resume)
         db.session.commit()
         
-        flash('Resume uploaded successfully!', 'success')
+        if previous:
+            upload.close()
+            flash('Resume uploaded successfully!', 'success')
+            return redirect(url_for('dashboard'))
+        
+        submit_extraction(current_app._get_current_object(), resume_id, upload, mime_type)
+        
+        flash('Resume uploaded! Extracting text...', 'success')
         return redirect(url_for('dashboard'))
     
     except Exception as e:
@@ -193,64 +422,114 @@ def upload_resume():
         return redirect(url_for('dashboard'))
 
 
-@app.route('/analyze-resume/<resume_id>')
+@app.route('/analyze-resume/<id:resume_id>')
 @login_required
 def analyze_resume_route(resume_id):
     user = get_current_user()
-    resume = Resume.query.filter_by(id=resume_id, user_id=user.id).first()
+    resume = db.session.execute(
+        select(Resume).where(Resume.id == resume_id, Resume.user_id == user.id)
+    ).scalar_one_or_none()
     
     if not resume:
         flash('Resume not found.', 'error')
         return redirect(url_for('dashboard'))
     
-    existing_analysis = Analysis.query.filter_by(resume_id=resume_id).first()
-    if existing_analysis:
+    if resume.status != 'ready':
+        flash('Your resume is still being processed. Please try again shortly.', 'error')
+        return redirect(url_for('dashboard'))
+    
+    existing_analysis = db.session.execute(
+        select(Analysis.id, Analysis.status, Analysis.created_at).where(Analysis.resume_id == resume_id).limit(1)
+    ).first()
+    if existing_analysis and existing_analysis.status != 'failed' and not is_stale(
+        existing_analysis.status, existing_analysis.created_at
+    ):
         return redirect(url_for('analysis_results', analysis_id=existing_analysis.id))
     
-    try:
-        result = analyze_resume(resume.extracted_text)
-        
-        analysis = Analysis(
+    if existing_analysis:
+        # Retry a failed or abandoned analysis in place of the old row
+        db.session.execute(delete(Analysis).where(Analysis.id == existing_analysis.id))
+    
+    # The same text uploaded again under another file reuses its earlier analysis
+    previous = db.session.execute(
+        select(Analysis).join(Resume, Analysis.resume_id == Resume.id).where(
+            Resume.user_id == user.id,
+            Resume.text_hash == resume.text_hash,
+            Analysis.status == 'ready'
+        ).limit(1)
+    ).scalar_one_or_none() if resume.text_hash else None
+    if previous:
+        analysis_id = generate_uuid()
+        db.session.add(Analysis(
+            id=analysis_id,
             resume_id=resume_id,
-            completeness_score=result['completenessScore'],
-            completeness_rationale=result['completenessRationale'],
-            section_scores=result['sectionScores'],
-            suggestions=result['suggestions']
-        )
-        db.session.add(analysis)
+            completeness_score=previous.completeness_score,
+            completeness_rationale=previous.completeness_rationale,
+            section_scores=previous.section_scores,
+            suggestions=previous.suggestions
+        ))
         db.session.commit()
-        
-        return redirect(url_for('analysis_results', analysis_id=analysis.id))
+        return redirect(url_for('analysis_results', analysis_id=analysis_id))
     
-    except Exception as e:
-        flash(f'Error analyzing resume: {str(e)}', 'error')
-        return redirect(url_for('dashboard'))
+    # Gemini takes several seconds, so the analysis runs in the background and the
+    # results page polls analysis_status until it is ready
+    analysis_id = generate_uuid()
+    resume_text = resume.load_text()
+    db.session.add(Analysis(id=analysis_id, resume_id=resume_id, status='processing'))
+    db.session.commit()
+    submit_analysis(current_app._get_current_object(), analysis_id, resume_text)
+    
+    return redirect(url_for('analysis_results', analysis_id=analysis_id))
 
 
-@app.route('/analysis/<analysis_id>')
+@app.route('/analysis/<id:analysis_id>')
 @login_required
 def analysis_results(analysis_id):
     user = get_current_user()
-    analysis = Analysis.query.get(analysis_id)
+    analysis = fetch_owned(Analysis, analysis_id, user.id)
     
     if not analysis:
         flash('Analysis not found.', 'error')
         return redirect(url_for('dashboard'))
     
-    resume = Resume.query.get(analysis.resume_id)
-    if resume.user_id != user.id:
-        flash('Access denied.', 'error')
-        return redirect(url_for('dashboard'))
+    if is_stale(analysis.status, analysis.created_at):
+        fail_stale(Analysis, Analysis.id == analysis.id)
     
-    return render_template('analysis.html', analysis=analysis, resume=resume, user=user)
+    return render_page('analysis.html', (analysis.id, analysis.status),
+                       analysis=analysis, resume=analysis.resume, user=user)
+
+
+@app.route('/analysis/<id:analysis_id>/status')
+@login_required
+def analysis_status(analysis_id):
+    user = get_current_user()
+    analysis = db.session.execute(
+        select(Analysis.id, Analysis.status, Analysis.error_message, Analysis.created_at).join(
+            Resume, Analysis.resume_id == Resume.id
+        ).where(Analysis.id == analysis_id, Resume.user_id == user.id)
+    ).first()
+    
+    if not analysis:
+        return ojson({'error': 'Analysis not found'}, 404)
+    
+    status, error = analysis.status, analysis.error_message
+    if is_stale(status, analysis.created_at):
+        fail_stale(Analysis, Analysis.id == analysis.id)
+        status, error = 'failed', STALE_JOB_MESSAGE
+    
+    return ojson({
+        'id': analysis.id,
+        'status': status,
+        'error': error
+    }, 202 if status == 'processing' else 200)
 
 
 @app.route('/job-match')
 @login_required
 def job_match():
     user = get_current_user()
-    resumes = Resume.query.filter_by(user_id=user.id).order_by(Resume.created_at.desc()).all()
-    return render_template('job_match.html', user=user, resumes=resumes)
+    resumes = list_resumes(user.id)
+    return render_page('job_match.html', resumes, user=user, resumes=resumes)
 
 
 @app.route('/job-match/analyze', methods=['POST'])
@@ -263,7 +542,7 @@ def job_match_analyze():
     job_role = request.form.get('job_role', '')
     job_location = request.form.get('job_location', '')
     
-    latest_resume = Resume.query.filter_by(user_id=user.id).order_by(Resume.created_at.desc()).first()
+    latest_resume = latest_ready_resume(user.id)
     
     if not latest_resume:
         flash('Please upload a resume first.', 'error')
@@ -271,15 +550,38 @@ def job_match_analyze():
     
     try:
         if mode == 'curated' and job_role and job_location:
-            job_description = generate_job_description(job_role, job_location)
+            job_description = get_curated_job_description(job_role, job_location)
         
         if not job_description:
             flash('Please provide a job description.', 'error')
             return redirect(url_for('job_match'))
         
-        result = analyze_job_match(latest_resume.extracted_text, job_description)
-        
+        # Matching the same resume text against the same description reuses the earlier scoring
+        previous = db.session.execute(
+            select(JobMatch.alignment_score, JobMatch.alignment_rationale,
+                   JobMatch.gaps, JobMatch.strengths).join(
+                Resume, JobMatch.resume_id == Resume.id
+            ).where(
+                Resume.user_id == user.id,
+                Resume.text_hash == latest_resume.text_hash,
+                JobMatch.job_description == job_description
+            ).limit(1)
+        ).first() if latest_resume.text_hash else None
+        if previous:
+            result = {
+                'alignmentScore': previous.alignment_score,
+                'alignmentRationale': previous.alignment_rationale,
+                'gaps': previous.gaps,
+                'strengths': previous.strengths
+            }
+        else:
+            resume_text = latest_resume.load_text()
+            release_db_connection()
+            result = analyze_job_match(resume_text, job_description)
+        
+        match_id = generate_uuid()
         job_match_record = JobMatch(
+            id=match_id,
             resume_id=latest_resume.id,
             job_description=job_description,
             job_role=job_role if mode == 'curated' else None,
@@ -292,425 +594,208 @@ def job_match_analyze():
         db.session.add(job_match_record)
         db.session.commit()
         
-        return redirect(url_for('job_match_results', match_id=job_match_record.id))
+        return redirect(url_for('job_match_results', match_id=match_id))
     
     except Exception as e:
         flash(f'Error analyzing job match: {str(e)}', 'error')
         return redirect(url_for('job_match'))
 
 
-@app.route('/job-match/<match_id>')
+@app.route('/job-match/<id:match_id>')
 @login_required
 def job_match_results(match_id):
     user = get_current_user()
-    match = JobMatch.query.get(match_id)
+    match = fetch_owned(JobMatch, match_id, user.id)
     
     if not match:
         flash('Job match not found.', 'error')
         return redirect(url_for('job_match'))
     
-    resume = Resume.query.get(match.resume_id)
-    if resume.user_id != user.id:
-        flash('Access denied.', 'error')
-        return redirect(url_for('job_match'))
-    
-    return render_template('job_match_results.html', match=match, resume=resume, user=user)
+    return render_template('job_match_results.html', match=match, resume=match.resume, user=user)
 
 
-@app.route('/job-match/<match_id>/submit-gaps', methods=['POST'])
+@app.route('/job-match/<id:match_id>/submit-gaps', methods=['POST'])
 @login_required
 def submit_gap_responses(match_id):
     user = get_current_user()
-    match = JobMatch.query.get(match_id)
+    match = fetch_owned(JobMatch, match_id, user.id)
     
     if not match:
-        return jsonify({'error': 'Job match not found'}), 404
+        return ojson({'error': 'Job match not found'}, 404)
     
-    resume = Resume.query.get(match.resume_id)
-    if resume.user_id != user.id:
-        return jsonify({'error': 'Access denied'}), 403
+    resume = match.resume
     
     try:
         gap_responses = request.json.get('gapResponses', [])
-        
-        verdict_result = generate_final_verdict(
-            resume.extracted_text,
-            match.job_description,
-            match.alignment_score,
-            match.gaps,
-            gap_responses
-        )
-        
+        resume_text = resume.load_text()
+        
+        # The tailored resume only depends on the gap responses, so generate it
+        # alongside the verdict; the results page then offers the PDF right away.
+        release_db_connection()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            verdict_future = pool.submit(
+                generate_final_verdict,
+                resume_text,
+                match.job_description,
+                match.alignment_score,
+                match.gaps,
+                gap_responses
+            )
+            resume_future = pool.submit(
+                _tailor_resume_with_pdf,
+                resume_text,
+                match.job_description,
+                match.strengths,
+                match.gaps,
+                gap_responses
+            )
+            verdict_result = verdict_future.result()
+            try:
+                tailored_result, tailored_pdf = resume_future.result()
+            except Exception:
+                # Still return the verdict; the user can generate the resume on demand
+                tailored_result, tailored_pdf = None, None
+        
+        db.session.add(match)
         match.gap_responses = gap_responses
         match.final_verdict = verdict_result['verdict']
         match.should_apply = verdict_result['shouldApply']
+        if tailored_result:
+            _apply_tailored_resume(match, tailored_result, tailored_pdf)
         db.session.commit()
         
-        return jsonify({
+        return ojson({
             'success': True,
             'finalVerdict': verdict_result['verdict'],
             'shouldApply': verdict_result['shouldApply']
         })
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 
-@app.route('/job-match/<match_id>/generate-resume', methods=['POST'])
+@app.route('/job-match/<id:match_id>/generate-resume', methods=['POST'])
 @login_required
 def generate_tailored_resume_route(match_id):
     user = get_current_user()
-    match = JobMatch.query.get(match_id)
+    match = fetch_owned(JobMatch, match_id, user.id)
     
     if not match:
-        return jsonify({'error': 'Job match not found'}), 404
+        return ojson({'error': 'Job match not found'}, 404)
     
-    resume = Resume.query.get(match.resume_id)
-    if resume.user_id != user.id:
-        return jsonify({'error': 'Access denied'}), 403
+    resume = match.resume
     
     try:
+        resume_text = resume.load_text()
+        release_db_connection()
         result = generate_tailored_resume(
-            resume.extracted_text,
+            resume_text,
             match.job_description,
             match.strengths,
             match.gaps,
             match.gap_responses or []
         )
         
-        match.changes_summary = result['changesSummary']
-        match.tailored_resume_content = result['resumeMarkdown']
+        db.session.add(match)
+        _apply_tailored_resume(match, result)
         db.session.commit()
         
-        return jsonify({
+        # The page reloads to show the result, so the resume body itself isn't echoed back
+        return ojson({
             'success': True,
-            'changesSummary': result['changesSummary'],
-            'resumeContent': result['resumeMarkdown']
+            'changesSummary': result['changesSummary']
         })
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 
-@app.route('/job-match/<match_id>/download-pdf')
+@app.route('/job-match/<id:match_id>/download-pdf')
 @login_required
 def download_tailored_resume_pdf(match_id):
     user = get_current_user()
-    match = JobMatch.query.get(match_id)
+    match = fetch_owned(JobMatch, match_id, user.id)
     
     if not match or not match.tailored_resume_content:
         flash('Tailored resume not found.', 'error')
         return redirect(url_for('job_match'))
     
-    resume = Resume.query.get(match.resume_id)
-    if resume.user_id != user.id:
-        flash('Access denied.', 'error')
-        return redirect(url_for('job_match'))
-    
-    content = match.tailored_resume_content
+    pdf_path, pdf_filename, pdf_etag = match.pdf_path, match.pdf_filename, match.pdf_etag
+    if not pdf_path or not os.path.exists(pdf_path):
+        _render_pdf(match)
+        pdf_path, pdf_filename, pdf_etag = match.pdf_path, match.pdf_filename, match.pdf_etag
+        db.session.commit()
     
+    # The ETag follows the resume content, so a browser's copy stays valid across re-renders
+    return send_file(pdf_path, as_attachment=True, download_name=pdf_filename,
+                     mimetype='application/pdf', etag=pdf_etag or True)
+
+
+def _tailor_resume_with_pdf(*args):
+    """Generate the tailored resume and lay out its PDF in the same worker thread.
+
+    Layout then overlaps the verdict call instead of running after it. The PDF is
+    None when layout fails; the caller falls back to rendering on demand.
+    """
+    result = generate_tailored_resume(*args)
     try:
-        resume_data = json.loads(content)
-        return generate_pdf_from_json(resume_data)
-    except json.JSONDecodeError:
-        return generate_pdf_from_text(content)
-
-
-def generate_pdf_from_json(data):
-    from reportlab.lib.units import inch
-    from reportlab.platypus import Spacer
-    
-    header = data.get('header', {})
-    sections = data.get('sections', [])
-    
-    name = header.get('name', 'Resume')
-    safe_name = re.sub(r'[^\w\s-]', '', name).replace(' ', '_')
-    filename = f"{safe_name}_tailored_resume.pdf"
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=50, leftMargin=50, topMargin=36, bottomMargin=36)
-    
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='ResumeName', fontSize=16, spaceAfter=0, alignment=1, fontName='Helvetica-Bold'))
-    styles.add(ParagraphStyle(name='ResumeTitle', fontSize=10, spaceAfter=4, alignment=1, fontName='Helvetica', textColor=colors.HexColor('#555555')))
-    styles.add(ParagraphStyle(name='ContactLine', fontSize=9, spaceAfter=2, alignment=1, textColor=colors.HexColor('#333333')))
-    styles.add(ParagraphStyle(name='LinksLine', fontSize=9, spaceAfter=6, alignment=1, textColor=colors.HexColor('#0066cc')))
-    styles.add(ParagraphStyle(name='SectionHeader', fontSize=10, spaceAfter=4, spaceBefore=10, fontName='Helvetica-Bold'))
-    styles.add(ParagraphStyle(name='ResumeBody', fontSize=9, leading=12, fontName='Helvetica'))
-    styles.add(ParagraphStyle(name='BulletItem', fontSize=9, leading=12, leftIndent=15, fontName='Helvetica'))
-    styles.add(ParagraphStyle(name='JobTitleLine', fontSize=9, leading=12, fontName='Helvetica-Bold', spaceBefore=6))
-    styles.add(ParagraphStyle(name='SkillLine', fontSize=9, leading=12, fontName='Helvetica'))
-    
-    story = []
-    
-    if name:
-        story.append(Paragraph(name, styles['ResumeName']))
-        story.append(Spacer(1, 8))
-    
-    titles = header.get('titles', [])
-    if titles:
-        story.append(Paragraph(' | '.join(titles), styles['ResumeTitle']))
-    
-    contact_parts = []
-    if header.get('email'):
-        contact_parts.append(header['email'])
-    if header.get('phone'):
-        contact_parts.append(header['phone'])
-    if header.get('location'):
-        contact_parts.append(header['location'])
-    if contact_parts:
-        story.append(Paragraph(' | '.join(contact_parts), styles['ContactLine']))
-    
-    link_html = []
-    if header.get('linkedin'):
-        url = make_url(header['linkedin'])
-        link_html.append(f'<a href="{url}" color="#0066cc">LinkedIn</a>')
-    if header.get('github'):
-        url = make_url(header['github'])
-        link_html.append(f'<a href="{url}" color="#0066cc">GitHub</a>')
-    if header.get('kaggle'):
-        url = make_url(header['kaggle'])
-        link_html.append(f'<a href="{url}" color="#0066cc">Kaggle</a>')
-    if header.get('medium'):
-        url = make_url(header['medium'])
-        link_html.append(f'<a href="{url}" color="#0066cc">Medium</a>')
-    if header.get('google_scholar'):
-        url = make_url(header['google_scholar'])
-        link_html.append(f'<a href="{url}" color="#0066cc">Google Scholar</a>')
-    
-    if link_html:
-        story.append(Paragraph(' | '.join(link_html), styles['LinksLine']))
-    
-    for section in sections:
-        title = section.get('title', '')
-        section_type = section.get('type', 'paragraph')
-        content = section.get('content', '')
-        
-        story.append(Paragraph(title.upper(), styles['SectionHeader']))
-        
-        if section_type == 'paragraph':
-            text = content.replace('L ATEX', 'LaTeX') if isinstance(content, str) else str(content)
-            story.append(Paragraph(text, styles['ResumeBody']))
-        
-        elif section_type == 'skills':
-            if isinstance(content, list):
-                for skill in content:
-                    cat = skill.get('category', '')
-                    items = skill.get('items', '')
-                    items = items.replace('L ATEX', 'LaTeX') if isinstance(items, str) else str(items)
-                    story.append(Paragraph(f"<b>{cat}:</b> {items}", styles['SkillLine']))
-        
-        elif section_type == 'inline':
-            text = content.replace('L ATEX', 'LaTeX') if isinstance(content, str) else str(content)
-            story.append(Paragraph(text, styles['ResumeBody']))
-        
-        elif section_type == 'jobs':
-            if isinstance(content, list):
-                for job in content:
-                    job_title = job.get('job_title', '')
-                    company = job.get('company', '')
-                    location = job.get('location', '')
-                    dates = job.get('dates', '')
-                    header_line = f"{job_title} | {company} | {location} | {dates}"
-                    story.append(Paragraph(header_line, styles['JobTitleLine']))
-                    for bullet in job.get('bullets', []):
-                        bullet = bullet.replace('L ATEX', 'LaTeX') if isinstance(bullet, str) else str(bullet)
-                        story.append(Paragraph(f"• {bullet}", styles['BulletItem']))
-        
-        elif section_type == 'education':
-            if isinstance(content, list):
-                for edu in content:
-                    degree = edu.get('degree', '')
-                    institution = edu.get('institution', '')
-                    dates = edu.get('dates', '')
-                    header_line = f"{degree} | {institution} | {dates}"
-                    story.append(Paragraph(header_line, styles['JobTitleLine']))
-                    for bullet in edu.get('bullets', []):
-                        bullet = bullet.replace('L ATEX', 'LaTeX') if isinstance(bullet, str) else str(bullet)
-                        story.append(Paragraph(f"• {bullet}", styles['BulletItem']))
-        
-        elif section_type == 'bullets':
-            if isinstance(content, list):
-                for item in content:
-                    item = item.replace('L ATEX', 'LaTeX') if isinstance(item, str) else str(item)
-                    story.append(Paragraph(f"• {item}", styles['BulletItem']))
-    
-    doc.build(story)
-    buffer.seek(0)
-    
-    return send_file(buffer, as_attachment=True, download_name=filename, mimetype='application/pdf')
-
-
-def generate_pdf_from_text(content):
-    content = content.replace('L ATEX', 'LaTeX').replace('LATEX', 'LaTeX')
-    lines = [l.strip() for l in content.split('\n')]
-    
-    user_name = extract_name_from_resume(content)
-    filename = f"{user_name}_tailored_resume.pdf"
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=50, leftMargin=50, topMargin=36, bottomMargin=36)
-    
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='ResumeName', fontSize=16, spaceAfter=8, alignment=1, fontName='Helvetica-Bold'))
-    styles.add(ParagraphStyle(name='ResumeTitle', fontSize=10, spaceAfter=4, alignment=1, fontName='Helvetica', textColor=colors.HexColor('#555555')))
-    styles.add(ParagraphStyle(name='ContactLine', fontSize=9, spaceAfter=2, alignment=1, textColor=colors.HexColor('#333333')))
-    styles.add(ParagraphStyle(name='LinksLine', fontSize=9, spaceAfter=6, alignment=1, textColor=colors.HexColor('#0066cc')))
-    styles.add(ParagraphStyle(name='SectionHeader', fontSize=10, spaceAfter=4, spaceBefore=10, fontName='Helvetica-Bold'))
-    styles.add(ParagraphStyle(name='ResumeBody', fontSize=9, leading=12, fontName='Helvetica'))
-    styles.add(ParagraphStyle(name='BulletItem', fontSize=9, leading=12, leftIndent=15, fontName='Helvetica'))
-    styles.add(ParagraphStyle(name='JobTitleLine', fontSize=9, leading=12, fontName='Helvetica-Bold', spaceBefore=6))
-    
-    story = []
-    section_keywords = ['PROFESSIONAL SUMMARY', 'SUMMARY', 'SKILLS', 'TECHNICAL SKILLS', 
-                        'EXPERIENCE', 'PROFESSIONAL EXPERIENCE', 'WORK EXPERIENCE',
-                        'EDUCATION', 'CERTIFICATIONS', 'PROJECTS', 'AWARDS', 
-                        'PROFESSIONAL MEMBERSHIP', 'LEADERSHIP', 'VOLUNTEERING', 
-                        'PUBLICATIONS', 'LANGUAGES', 'INTERESTS']
-    
-    name = None
-    title = None
-    contact = None
-    links_text = None
-    header_end_idx = 0
-    
-    for i, line in enumerate(lines):
-        if not line:
-            continue
-        is_section = any(line.upper() == kw or line.upper().startswith(kw + ',') for kw in section_keywords)
-        if is_section:
-            header_end_idx = i
-            break
-        has_email = '@' in line and '.' in line
-        has_phone = bool(re.search(r'\(\d{3}\)\s*\d{3}[-.]?\d{4}|\d{3}[-.]?\d{3}[-.]?\d{4}', line))
-        has_links = any(x in line.lower() for x in ['linkedin', 'github', 'kaggle', 'medium', 'scholar'])
-        
-        if not name and not has_email and not has_phone and not has_links:
-            name = re.sub(r'[#*]', '', line).strip()
-            continue
-        if name and not title and '|' in line and not has_email and not has_phone and not has_links:
-            title = line
-            continue
-        if has_email or has_phone:
-            parts = [p.strip() for p in line.split('|')]
-            contact_parts = [p for p in parts if not any(x in p.lower() for x in ['linkedin', 'github', 'kaggle', 'medium', 'scholar'])]
-            link_parts = [p for p in parts if any(x in p.lower() for x in ['linkedin', 'github', 'kaggle', 'medium', 'scholar'])]
-            if contact_parts:
-                contact = ' | '.join(contact_parts)
-            if link_parts:
-                links_text = ' | '.join(link_parts)
-            continue
-        if has_links:
-            links_text = (links_text + ' | ' + line) if links_text else line
-            continue
-    
-    if name:
-        story.append(Paragraph(name, styles['ResumeName']))
-    if title:
-        story.append(Paragraph(title, styles['ResumeTitle']))
-    if contact:
-        story.append(Paragraph(contact, styles['ContactLine']))
-    if links_text:
-        link_parts = [p.strip() for p in links_text.split('|')]
-        link_html = []
-        for part in link_parts:
-            if part:
-                if 'scholar' in part.lower():
-                    url = make_url(part)
-                    link_html.append(f'<a href="{url}" color="#0066cc">Google Scholar</a>')
-                else:
-                    url = make_url(part)
-                    display = get_link_display(part)
-                    link_html.append(f'<a href="{url}" color="#0066cc">{display}</a>')
-        if link_html:
-            story.append(Paragraph(' | '.join(link_html), styles['LinksLine']))
-    
-    current_section = None
-    for i, line in enumerate(lines):
-        if i < header_end_idx or not line:
-            continue
-        is_section = any(line.upper() == kw or line.upper().startswith(kw + ',') or line.upper().startswith(kw + ' ') for kw in section_keywords)
-        if is_section:
-            story.append(Paragraph(line.upper(), styles['SectionHeader']))
-            current_section = line.upper()
-            continue
-        if not current_section:
-            continue
-        if line.startswith('•') or line.startswith('-') or line.startswith('*'):
-            bullet_text = line.lstrip('•-* ').strip()
-            story.append(Paragraph(f"• {bullet_text}", styles['BulletItem']))
-            continue
-        is_job_line = '|' in line and any(x in line for x in ['–', '—', 'Present', '2019', '2020', '2021', '2022', '2023', '2024', '2025'])
-        if is_job_line and 'EDUCATION' not in current_section:
-            story.append(Paragraph(line, styles['JobTitleLine']))
-            continue
-        if 'EDUCATION' in current_section and ('–' in line or '—' in line or any(f'{y}' in line for y in range(2004, 2026))):
-            story.append(Paragraph(line, styles['JobTitleLine']))
-            continue
-        story.append(Paragraph(line, styles['ResumeBody']))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return send_file(buffer, as_attachment=True, download_name=filename, mimetype='application/pdf')
-
-
-def make_url(text):
-    text_lower = text.lower().strip()
-    if 'linkedin.com' in text_lower:
-        match = re.search(r'linkedin\.com/in/[^\s\|]+', text_lower)
-        return 'https://' + match.group(0).rstrip('/') if match else 'https://linkedin.com'
-    if 'github.com' in text_lower:
-        match = re.search(r'github\.com/[^\s\|]+', text_lower)
-        return 'https://' + match.group(0).rstrip('/') if match else 'https://github.com'
-    if 'kaggle.com' in text_lower:
-        match = re.search(r'kaggle\.com/[^\s\|]+', text_lower)
-        return 'https://' + match.group(0).rstrip('/') if match else 'https://kaggle.com'
-    if 'medium.com' in text_lower:
-        match = re.search(r'medium\.com/@?[^\s\|]+', text_lower)
-        return 'https://' + match.group(0).rstrip('/') if match else 'https://medium.com'
-    if 'scholar' in text_lower:
-        return 'https://scholar.google.com'
-    if text_lower.startswith('http'):
-        return text.strip()
-    return 'https://' + text.strip()
-
-
-def get_link_display(text):
-    t = text.lower()
-    if 'linkedin' in t: return 'LinkedIn'
-    if 'github' in t: return 'GitHub'
-    if 'kaggle' in t: return 'Kaggle'
-    if 'medium' in t: return 'Medium'
-    if 'scholar' in t: return 'Google Scholar'
-    return text.strip()
-
-
-def extract_name_from_resume(content: str) -> str:
-    lines = content.split('\n')
-    section_headers = ['PROFESSIONAL SUMMARY', 'SKILLS', 'EXPERIENCE', 'EDUCATION', 'SECTION']
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        line_upper = line.upper()
-        if any(line_upper.startswith(h) for h in section_headers):
-            continue
-        if '|' in line or '@' in line:
-            continue
-        name = re.sub(r'[#*]', '', line).strip()
-        name = re.sub(r'[^\w\s]', '', name).strip()
-        if name and len(name) > 2:
-            return name
-    return 'User'
+        pdf = build_tailored_pdf_offloaded(result['resumeMarkdown'])
+    except Exception:
+        pdf = None
+    return result, pdf
+
+
+def _apply_tailored_resume(match, result, pdf=None):
+    match.changes_summary = result['changesSummary']
+    match.tailored_resume_content = result['resumeMarkdown']
+    match.pdf_path = None
+    match.pdf_filename = None
+    match.pdf_etag = None
+    try:
+        _render_pdf(match, pdf)
+    except Exception:
+        # The download route renders on demand if the eager render fails
+        pass
+
+
+def _render_pdf(match, pdf=None):
+    """Write the match's tailored resume PDF to storage and record its path on the match.
+
+    `pdf` is a prebuilt (bytes, filename) pair; without one the PDF is rendered
+    straight into the storage file.
+    """
+    if pdf is None and PDF_POOL is not None:
+        pdf = build_tailored_pdf_offloaded(match.tailored_resume_content)
+    os.makedirs(Config.TAILORED_PDF_DIR, exist_ok=True)
+    path = os.path.join(Config.TAILORED_PDF_DIR, f'{match.id}.pdf')
+    # Concurrent renders of the same match each write their own file; whichever
+    # replace lands last wins, and neither can expose the other's partial write
+    fd, tmp_path = tempfile.mkstemp(dir=Config.TAILORED_PDF_DIR, prefix=f'{match.id}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if pdf:
+                pdf_bytes, filename = pdf
+                f.write(pdf_bytes)
+            else:
+                filename = write_tailored_pdf(match.tailored_resume_content, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    match.pdf_path = path
+    match.pdf_filename = filename
+    match.pdf_etag = tailored_pdf_etag(match.tailored_resume_content)
 
 
 @app.route('/career-roadmap')
 @login_required
 def career_roadmap():
     user = get_current_user()
-    resumes = Resume.query.filter_by(user_id=user.id).order_by(Resume.created_at.desc()).all()
-    roadmaps = CareerRoadmap.query.filter_by(user_id=user.id).order_by(CareerRoadmap.created_at.desc()).all()
-    return render_template('career_roadmap.html', user=user, resumes=resumes, roadmaps=roadmaps)
+    resumes = list_resumes(user.id)
+    roadmaps = db.session.query(*ROADMAP_LIST_COLUMNS).filter_by(user_id=user.id).order_by(
+        CareerRoadmap.created_at.desc()
+    ).all()
+    return render_page('career_roadmap.html', (resumes, roadmaps), user=user, resumes=resumes, roadmaps=roadmaps)
 
 
 @app.route('/career-roadmap/generate', methods=['POST'])
@@ -726,53 +811,74 @@ def generate_roadmap():
         flash('Please provide your dream role and location.', 'error')
         return redirect(url_for('career_roadmap'))
     
-    latest_resume = Resume.query.filter_by(user_id=user.id).order_by(Resume.created_at.desc()).first()
+    latest_resume = latest_ready_resume(user.id)
     
     if not latest_resume:
         flash('Please upload a resume first.', 'error')
         return redirect(url_for('career_roadmap'))
     
-    try:
-        result = generate_career_roadmap(
-            latest_resume.extracted_text,
-            dream_role,
-            dream_location,
-            timeframe
-        )
-        
-        roadmap = CareerRoadmap(
-            user_id=user.id,
-            resume_id=latest_resume.id,
-            dream_role=dream_role,
-            dream_location=dream_location,
-            timeframe=timeframe,
-            current_gaps=result['currentGaps'],
-            skills_to_acquire=result['skillsToAcquire'],
-            action_plan=result['actionPlan'],
-            resources=result['resources'],
-            milestones=result['milestones']
-        )
-        db.session.add(roadmap)
-        db.session.commit()
-        
-        return redirect(url_for('career_roadmap_results', roadmap_id=roadmap.id))
+    # Like resume analysis, the roadmap is generated in the background and the
+    # results page polls roadmap_status until it is ready
+    roadmap_id = generate_uuid()
+    resume_text = latest_resume.load_text()
+    db.session.add(CareerRoadmap(
+        id=roadmap_id,
+        user_id=user.id,
+        resume_id=latest_resume.id,
+        dream_role=dream_role,
+        dream_location=dream_location,
+        timeframe=timeframe,
+        status='processing'
+    ))
+    db.session.commit()
+    submit_roadmap(current_app._get_current_object(), roadmap_id, resume_text,
+                   dream_role, dream_location, timeframe)
+    
+    return redirect(url_for('career_roadmap_results', roadmap_id=roadmap_id))
+
+
+@app.route('/career-roadmap/<id:roadmap_id>')
+@login_required
+def career_roadmap_results(roadmap_id):
+    user = get_current_user()
+    roadmap = CareerRoadmap.query.filter_by(id=roadmap_id, user_id=user.id).first()
     
-    except Exception as e:
-        flash(f'Error generating roadmap: {str(e)}', 'error')
+    if not roadmap:
+        flash('Roadmap not found.', 'error')
         return redirect(url_for('career_roadmap'))
+    
+    if is_stale(roadmap.status, roadmap.created_at):
+        fail_stale(CareerRoadmap, CareerRoadmap.id == roadmap.id)
+    
+    # Roadmaps are never edited once generated, so only their status changes the page
+    return render_page('career_roadmap_results.html', (roadmap.id, roadmap.status),
+                       roadmap=roadmap, user=user)
 
 
-@app.route('/career-roadmap/<roadmap_id>')
+@app.route('/career-roadmap/<id:roadmap_id>/status')
 @login_required
-def career_roadmap_results(roadmap_id):
+def roadmap_status(roadmap_id):
     user = get_current_user()
-    roadmap = CareerRoadmap.query.get(roadmap_id)
+    roadmap = db.session.execute(
+        select(CareerRoadmap.id, CareerRoadmap.status, CareerRoadmap.error_message,
+               CareerRoadmap.created_at).where(
+            CareerRoadmap.id == roadmap_id, CareerRoadmap.user_id == user.id
+        )
+    ).first()
     
-    if not roadmap or roadmap.user_id != user.id:
-        flash('Roadmap not found.', 'error')
-        return redirect(url_for('career_roadmap'))
+    if not roadmap:
+        return ojson({'error': 'Roadmap not found'}, 404)
+    
+    status, error = roadmap.status, roadmap.error_message
+    if is_stale(status, roadmap.created_at):
+        fail_stale(CareerRoadmap, CareerRoadmap.id == roadmap.id)
+        status, error = 'failed', STALE_JOB_MESSAGE
     
-    return render_template('career_roadmap_results.html', roadmap=roadmap, user=user)
+    return ojson({
+        'id': roadmap.id,
+        'status': status,
+        'error': error
+    }, 202 if status == 'processing' else 200)
 
 
 @app.errorhandler(404)
@@ -780,6 +886,19 @@ def not_found_error(error):
     return render_template('404.html'), 404
 
 
+RATE_LIMITED_TEMPLATES = {'login': 'login.html', 'register': 'register.html'}
+
+
+@app.errorhandler(429)
+def rate_limited_error(error):
+    template = RATE_LIMITED_TEMPLATES.get(request.endpoint)
+    if template is None:
+        return error
+    # Send the user back to the form they submitted
+    flash('Too many attempts. Please wait a minute and try again.', 'error')
+    return render_template(template), 429
+
+
 @app.errorhandler(500)
 def internal_error(error):
     db.session.rollback()
@@ -787,4 +906,7 @@ def internal_error(error):
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Development server only; production runs under gunicorn (see gunicorn_conf.py)
+    port = int(os.environ.get('PORT', 5000))
+    debug = os.environ.get('FLASK_DEBUG', 'true').lower() == 'true'
+    app.run(host='0.0.0.0', port=port, debug=debug)
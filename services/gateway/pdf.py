@@ -0,0 +1,493 @@
+# PDF rendering for tailored resumes
+#
+# Tailored resume content (JSON or plain text) is first parsed into a flat list of
+# (style_name, markup) elements, then drawn either directly on a ReportLab canvas
+# (default, fast) or through the Platypus layout engine (PDF_RENDERER=platypus).
+import hashlib
+import html
+import io
+import json
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+from shared.config import Config
+
+SPACER = None
+
+PAGE_MARGINS = {'rightMargin': 50, 'leftMargin': 50, 'topMargin': 36, 'bottomMargin': 36}
+FRAME_PADDING = 6
+
+# Layout is CPU-bound and holds the GIL; with PDF_PROCESSES set it runs in worker
+# processes so a render never stalls the other requests on a gevent worker.
+# Spawned rather than forked, since the parent is a monkey-patched gevent process.
+PDF_POOL = ProcessPoolExecutor(
+    max_workers=Config.PDF_PROCESSES, mp_context=multiprocessing.get_context('spawn')
+) if Config.PDF_PROCESSES > 0 else None
+
+
+def build_tailored_pdf(content):
+    """Render tailored resume content (JSON or plain text) to PDF bytes and a download filename."""
+    buffer = io.BytesIO()
+    filename = write_tailored_pdf(content, buffer)
+    return buffer.getvalue(), filename
+
+
+def build_tailored_pdf_offloaded(content):
+    """Same as build_tailored_pdf, run in the PDF process pool when one is configured."""
+    if PDF_POOL is None:
+        return build_tailored_pdf(content)
+    return PDF_POOL.submit(build_tailored_pdf, content).result()
+
+
+def tailored_pdf_etag(content):
+    """Identify the PDF a given tailored resume renders to, for HTTP caching."""
+    return hashlib.sha256(f'{Config.PDF_RENDERER}:{content}'.encode('utf-8')).hexdigest()
+
+
+def write_tailored_pdf(content, out):
+    """Render tailored resume content into a writable binary file and return its download filename."""
+    try:
+        resume_data = json.loads(content)
+    except json.JSONDecodeError:
+        elements, filename = resume_elements_from_text(content)
+    else:
+        elements, filename = resume_elements_from_json(resume_data)
+    
+    # The canvas renderer only understands <b> and <a>; any other inline markup
+    # (<i>, <br/>, <font>...) would print literally, so Platypus lays those out
+    if Config.PDF_RENDERER == 'platypus' or any(
+        _FOREIGN_MARKUP_RE.search(value) for style_name, value in elements if style_name is not SPACER
+    ):
+        render_resume_pdf_platypus(elements, out)
+    else:
+        render_resume_pdf_fast(elements, out)
+    return filename
+
+
+def _build_resume_styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='ResumeName', fontSize=16, spaceAfter=0, alignment=1, fontName='Helvetica-Bold'))
+    styles.add(ParagraphStyle(name='ResumeTitle', fontSize=10, spaceAfter=4, alignment=1, fontName='Helvetica', textColor=colors.HexColor('#555555')))
+    styles.add(ParagraphStyle(name='ContactLine', fontSize=9, spaceAfter=2, alignment=1, textColor=colors.HexColor('#333333')))
+    styles.add(ParagraphStyle(name='LinksLine', fontSize=9, spaceAfter=6, alignment=1, textColor=colors.HexColor('#0066cc')))
+    styles.add(ParagraphStyle(name='SectionHeader', fontSize=10, spaceAfter=4, spaceBefore=10, fontName='Helvetica-Bold'))
+    styles.add(ParagraphStyle(name='ResumeBody', fontSize=9, leading=12, fontName='Helvetica'))
+    styles.add(ParagraphStyle(name='BulletItem', fontSize=9, leading=12, leftIndent=15, fontName='Helvetica'))
+    styles.add(ParagraphStyle(name='JobTitleLine', fontSize=9, leading=12, fontName='Helvetica-Bold', spaceBefore=6))
+    styles.add(ParagraphStyle(name='SkillLine', fontSize=9, leading=12, fontName='Helvetica'))
+    return styles
+
+
+# Built once at import; the renderers only read from it
+RESUME_STYLES = _build_resume_styles()
+
+
+def render_resume_pdf_platypus(elements, out):
+    styles = RESUME_STYLES
+    story = []
+    for style_name, value in elements:
+        if style_name is SPACER:
+            story.append(Spacer(1, value))
+        else:
+            story.append(Paragraph(value, styles[style_name]))
+    
+    doc = SimpleDocTemplate(out, pagesize=letter, **PAGE_MARGINS)
+    doc.build(story)
+
+
+_MARKUP_RE = re.compile(r'<(/?)(b|a)\b([^>]*)>', re.I)
+_FOREIGN_MARKUP_RE = re.compile(r'</?(?!(?:b|a)\b)[a-z][^>]*>', re.I)
+_HREF_RE = re.compile(r'href="([^"]*)"')
+_BOLD_FONTS = {'Helvetica': 'Helvetica-Bold', 'Times-Roman': 'Times-Bold', 'Courier': 'Courier-Bold'}
+
+
+def _markup_words(markup, font_name, font_size, widths):
+    """Split Paragraph-style markup (<b>, <a href>) into (word, font, width, url) tuples."""
+    words = []
+    bold = False
+    url = None
+    pos = 0
+    for tag in list(_MARKUP_RE.finditer(markup)) + [None]:
+        text = markup[pos:tag.start()] if tag else markup[pos:]
+        font = _BOLD_FONTS.get(font_name, font_name) if bold else font_name
+        for word in html.unescape(text).split():
+            key = (word, font)
+            width = widths.get(key)
+            if width is None:
+                width = widths[key] = stringWidth(word, font, font_size)
+            words.append((word, font, width, url))
+        if tag is None:
+            break
+        pos = tag.end()
+        closing, name, attrs = tag.group(1), tag.group(2).lower(), tag.group(3)
+        if name == 'b':
+            bold = not closing
+        else:
+            href = _HREF_RE.search(attrs)
+            url = None if closing or not href else href.group(1)
+    return words
+
+
+def _layout_lines(words, max_width, space_width):
+    """Greedy-wrap words into lines of runs; each run is (text, font, width, url)."""
+    lines = []
+    runs = []
+    line_width = 0
+    for word, font, width, url in words:
+        space = space_width[font] if runs else 0
+        if runs and line_width + space + width > max_width:
+            lines.append((runs, line_width))
+            runs, line_width, space = [], 0, 0
+        if runs and runs[-1][1] == font and runs[-1][3] == url:
+            text, _, run_width, _ = runs[-1]
+            runs[-1] = (f'{text} {word}', font, run_width + space + width, url)
+        else:
+            runs.append((word, font, width, url))
+        line_width += space + width
+    if runs:
+        lines.append((runs, line_width))
+    return lines
+
+
+def render_resume_pdf_fast(elements, out):
+    """Draw resume elements straight onto a canvas, bypassing Platypus flowable layout."""
+    styles = RESUME_STYLES
+    page_width, page_height = letter
+    left = PAGE_MARGINS['leftMargin'] + FRAME_PADDING
+    right = page_width - PAGE_MARGINS['rightMargin'] - FRAME_PADDING
+    top = page_height - PAGE_MARGINS['topMargin'] - FRAME_PADDING
+    bottom = PAGE_MARGINS['bottomMargin'] + FRAME_PADDING
+    
+    pdf = canvas.Canvas(out, pagesize=letter)
+    y = top
+    widths = {}
+    # Like a Platypus frame, a paragraph's spaceBefore overlaps the previous one's spaceAfter
+    space_after = 0
+    
+    for style_name, value in elements:
+        if style_name is SPACER:
+            y -= value
+            space_after = 0
+            continue
+        style = styles[style_name]
+        if y < top:
+            y -= max(style.spaceBefore - space_after, 0)
+        
+        x0 = left + style.leftIndent
+        max_width = right - style.rightIndent - x0
+        font_size = style.fontSize
+        space_width = {font: stringWidth(' ', font, font_size)
+                       for font in (style.fontName, _BOLD_FONTS.get(style.fontName, style.fontName))}
+        words = _markup_words(value, style.fontName, font_size, widths)
+        
+        pdf.setFillColor(style.textColor)
+        for runs, line_width in _layout_lines(words, max_width, space_width):
+            if y - style.leading < bottom:
+                pdf.showPage()
+                pdf.setFillColor(style.textColor)
+                y = top
+            y -= style.leading
+            x = x0 + (max_width - line_width) / 2 if style.alignment == TA_CENTER else x0
+            baseline = y + (style.leading - font_size)
+            for i, (text, font, width, url) in enumerate(runs):
+                if i:
+                    x += space_width[font]
+                pdf.setFont(font, font_size)
+                pdf.drawString(x, baseline, text)
+                if url:
+                    pdf.linkURL(url, (x, baseline - 2, x + width, baseline + font_size), relative=0)
+                x += width
+        
+        y -= style.spaceAfter
+        space_after = style.spaceAfter
+    
+    pdf.save()
+
+
+_SAFE_FILENAME_RE = re.compile(r'[^\w\s-]')
+_LATEX_RE = re.compile(r'L ?ATEX')
+_PHONE_RE = re.compile(r'\(\d{3}\)\s*\d{3}[-.]?\d{4}|\d{3}[-.]?\d{3}[-.]?\d{4}')
+_HEADING_MARKS_RE = re.compile(r'[#*]')
+_LINK_DOMAINS_RE = re.compile(r'linkedin|github|kaggle|medium|scholar', re.I)
+_BULLET_PREFIXES = ('•', '-', '*')
+# Dashes, 'Present' or a recent year mark a "Title | Company | Dates" line
+_JOB_DATE_RE = re.compile(r'–|—|Present|20(?:19|2[0-5])')
+# Education entries go further back: any dash or a year from 2004 to 2025
+_EDUCATION_DATE_RE = re.compile(r'–|—|20(?:0[4-9]|1\d|2[0-5])')
+_LINK_DISPLAY = {
+    'linkedin': 'LinkedIn',
+    'github': 'GitHub',
+    'kaggle': 'Kaggle',
+    'medium': 'Medium',
+    'scholar': 'Google Scholar',
+}
+
+SECTION_HEADERS = frozenset([
+    'PROFESSIONAL SUMMARY', 'SUMMARY', 'SKILLS', 'TECHNICAL SKILLS',
+    'EXPERIENCE', 'PROFESSIONAL EXPERIENCE', 'WORK EXPERIENCE',
+    'EDUCATION', 'CERTIFICATIONS', 'PROJECTS', 'AWARDS',
+    'PROFESSIONAL MEMBERSHIP', 'LEADERSHIP', 'VOLUNTEERING',
+    'PUBLICATIONS', 'LANGUAGES', 'INTERESTS',
+])
+# A header followed by more text, e.g. "SKILLS, TOOLS"; one scan instead of a loop over headers
+_SECTION_PREFIX_RE = re.compile(
+    '(?:' + '|'.join(re.escape(h) for h in sorted(SECTION_HEADERS, key=len, reverse=True)) + ')([, ])'
+)
+
+
+def _section_separator(line_upper):
+    """Return '' for an exact section header, the separator after a header prefix, or None."""
+    if line_upper in SECTION_HEADERS:
+        return ''
+    match = _SECTION_PREFIX_RE.match(line_upper)
+    return match.group(1) if match else None
+
+
+def _fix_latex(text):
+    return _LATEX_RE.sub('LaTeX', text) if isinstance(text, str) else str(text)
+
+
+def resume_elements_from_json(data):
+    header = data.get('header', {})
+    sections = data.get('sections', [])
+    
+    name = header.get('name', 'Resume')
+    safe_name = _SAFE_FILENAME_RE.sub('', name).replace(' ', '_')
+    filename = f"{safe_name}_tailored_resume.pdf"
+    
+    story = []
+    
+    if name:
+        story.append(('ResumeName', name))
+        story.append((SPACER, 8))
+    
+    titles = header.get('titles', [])
+    if titles:
+        story.append(('ResumeTitle', ' | '.join(titles)))
+    
+    contact_parts = []
+    if header.get('email'):
+        contact_parts.append(header['email'])
+    if header.get('phone'):
+        contact_parts.append(header['phone'])
+    if header.get('location'):
+        contact_parts.append(header['location'])
+    if contact_parts:
+        story.append(('ContactLine', ' | '.join(contact_parts)))
+    
+    link_html = []
+    if header.get('linkedin'):
+        url = make_url(header['linkedin'])
+        link_html.append(f'<a href="{url}" color="#0066cc">LinkedIn</a>')
+    if header.get('github'):
+        url = make_url(header['github'])
+        link_html.append(f'<a href="{url}" color="#0066cc">GitHub</a>')
+    if header.get('kaggle'):
+        url = make_url(header['kaggle'])
+        link_html.append(f'<a href="{url}" color="#0066cc">Kaggle</a>')
+    if header.get('medium'):
+        url = make_url(header['medium'])
+        link_html.append(f'<a href="{url}" color="#0066cc">Medium</a>')
+    if header.get('google_scholar'):
+        url = make_url(header['google_scholar'])
+        link_html.append(f'<a href="{url}" color="#0066cc">Google Scholar</a>')
+    
+    if link_html:
+        story.append(('LinksLine', ' | '.join(link_html)))
+    
+    for section in sections:
+        title = section.get('title', '')
+        section_type = section.get('type', 'paragraph')
+        content = section.get('content', '')
+        
+        story.append(('SectionHeader', title.upper()))
+        
+        if section_type == 'paragraph':
+            story.append(('ResumeBody', _fix_latex(content)))
+        
+        elif section_type == 'skills':
+            if isinstance(content, list):
+                for skill in content:
+                    cat = skill.get('category', '')
+                    items = _fix_latex(skill.get('items', ''))
+                    story.append(('SkillLine', f"<b>{cat}:</b> {items}"))
+        
+        elif section_type == 'inline':
+            story.append(('ResumeBody', _fix_latex(content)))
+        
+        elif section_type == 'jobs':
+            if isinstance(content, list):
+                for job in content:
+                    job_title = job.get('job_title', '')
+                    company = job.get('company', '')
+                    location = job.get('location', '')
+                    dates = job.get('dates', '')
+                    header_line = f"{job_title} | {company} | {location} | {dates}"
+                    story.append(('JobTitleLine', header_line))
+                    for bullet in job.get('bullets', []):
+                        story.append(('BulletItem', f"• {_fix_latex(bullet)}"))
+        
+        elif section_type == 'education':
+            if isinstance(content, list):
+                for edu in content:
+                    degree = edu.get('degree', '')
+                    institution = edu.get('institution', '')
+                    dates = edu.get('dates', '')
+                    header_line = f"{degree} | {institution} | {dates}"
+                    story.append(('JobTitleLine', header_line))
+                    for bullet in edu.get('bullets', []):
+                        story.append(('BulletItem', f"• {_fix_latex(bullet)}"))
+        
+        elif section_type == 'bullets':
+            if isinstance(content, list):
+                for item in content:
+                    story.append(('BulletItem', f"• {_fix_latex(item)}"))
+    
+    return story, filename
+
+
+def resume_elements_from_text(content):
+    content = _LATEX_RE.sub('LaTeX', content)
+    
+    user_name = extract_name_from_resume(content)
+    filename = f"{user_name}_tailored_resume.pdf"
+    
+    name = None
+    title = None
+    contact = None
+    links_text = None
+    body = []
+    # Lines before the first section header describe the candidate; everything after is body
+    current_section = None
+    
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        line_upper = line.upper()
+        if _section_separator(line_upper) is not None:
+            body.append(('SectionHeader', line_upper))
+            current_section = line_upper
+            continue
+        
+        if current_section is None:
+            has_email = '@' in line and '.' in line
+            has_phone = bool(_PHONE_RE.search(line))
+            has_links = bool(_LINK_DOMAINS_RE.search(line))
+            
+            if not name and not has_email and not has_phone and not has_links:
+                name = _HEADING_MARKS_RE.sub('', line).strip()
+                continue
+            if name and not title and '|' in line and not has_email and not has_phone and not has_links:
+                title = line
+                continue
+            if has_email or has_phone:
+                parts = [p.strip() for p in line.split('|')]
+                contact_parts = []
+                link_parts = []
+                for p in parts:
+                    (link_parts if _LINK_DOMAINS_RE.search(p) else contact_parts).append(p)
+                if contact_parts:
+                    contact = ' | '.join(contact_parts)
+                if link_parts:
+                    links_text = ' | '.join(link_parts)
+                continue
+            if has_links:
+                links_text = (links_text + ' | ' + line) if links_text else line
+            continue
+        
+        if line.startswith(_BULLET_PREFIXES):
+            bullet_text = line.lstrip('•-* ').strip()
+            body.append(('BulletItem', f"• {bullet_text}"))
+            continue
+        in_education = 'EDUCATION' in current_section
+        if not in_education and '|' in line and _JOB_DATE_RE.search(line):
+            body.append(('JobTitleLine', line))
+            continue
+        if in_education and _EDUCATION_DATE_RE.search(line):
+            body.append(('JobTitleLine', line))
+            continue
+        body.append(('ResumeBody', line))
+    
+    story = _text_header_elements(name, title, contact, links_text)
+    story.extend(body)
+    return story, filename
+
+
+def _text_header_elements(name, title, contact, links_text):
+    story = []
+    if name:
+        story.append(('ResumeName', name))
+        story.append((SPACER, 8))
+    if title:
+        story.append(('ResumeTitle', title))
+    if contact:
+        story.append(('ContactLine', contact))
+    if links_text:
+        link_parts = [p.strip() for p in links_text.split('|')]
+        link_html = []
+        for part in link_parts:
+            if part:
+                link_html.append(f'<a href="{make_url(part)}" color="#0066cc">{get_link_display(part)}</a>')
+        if link_html:
+            story.append(('LinksLine', ' | '.join(link_html)))
+    return story
+
+
+_LINKEDIN_RE = re.compile(r'linkedin\.com/in/[^\s\|]+')
+_GITHUB_RE = re.compile(r'github\.com/[^\s\|]+')
+_KAGGLE_RE = re.compile(r'kaggle\.com/[^\s\|]+')
+_MEDIUM_RE = re.compile(r'medium\.com/@?[^\s\|]+')
+
+
+def make_url(text):
+    text_lower = text.lower().strip()
+    if 'linkedin.com' in text_lower:
+        match = _LINKEDIN_RE.search(text_lower)
+        return 'https://' + match.group(0).rstrip('/') if match else 'https://linkedin.com'
+    if 'github.com' in text_lower:
+        match = _GITHUB_RE.search(text_lower)
+        return 'https://' + match.group(0).rstrip('/') if match else 'https://github.com'
+    if 'kaggle.com' in text_lower:
+        match = _KAGGLE_RE.search(text_lower)
+        return 'https://' + match.group(0).rstrip('/') if match else 'https://kaggle.com'
+    if 'medium.com' in text_lower:
+        match = _MEDIUM_RE.search(text_lower)
+        return 'https://' + match.group(0).rstrip('/') if match else 'https://medium.com'
+    if 'scholar' in text_lower:
+        return 'https://scholar.google.com'
+    if text_lower.startswith('http'):
+        return text.strip()
+    return 'https://' + text.strip()
+
+
+def get_link_display(text):
+    match = _LINK_DOMAINS_RE.search(text)
+    return _LINK_DISPLAY[match.group(0).lower()] if match else text.strip()
+
+
+_NAME_HEADERS = ('PROFESSIONAL SUMMARY', 'SKILLS', 'EXPERIENCE', 'EDUCATION', 'SECTION')
+_NAME_CLEAN_RE = re.compile(r'[^\w\s]')
+
+
+def extract_name_from_resume(content: str) -> str:
+    # The name always sits at the top, so only the first 20 lines are worth scanning
+    for line in content.split('\n', 20)[:20]:
+        line = line.strip()
+        if not line or '|' in line or '@' in line:
+            continue
+        if line.upper().startswith(_NAME_HEADERS):
+            continue
+        name = _NAME_CLEAN_RE.sub('', line).strip()
+        if len(name) > 2:
+            return name
+    return 'User'
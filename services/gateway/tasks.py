@@ -0,0 +1,146 @@
+# Background Tasks - Runs slow work (text extraction, Gemini analysis) off the request thread
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+import multiprocessing
+from typing import BinaryIO
+
+from sqlalchemy import update
+
+from shared.config import Config
+from shared.models import db, Resume, Analysis, CareerRoadmap
+from resume_service.file_processor import extract_text_from_file, extract_text_from_path, text_fingerprint
+from ai_service.gemini import analyze_resume, generate_career_roadmap
+
+executor = ThreadPoolExecutor(max_workers=Config.BACKGROUND_WORKERS, thread_name_prefix='resumatch-bg')
+
+# Under the gevent workers the executor's threads are greenlets, so CPU-bound parsing,
+# page rendering and OCR would stall every request on the worker; extraction runs in
+# spawned processes instead. gevent's native threadpool can't be used: OCR starts
+# Tesseract subprocesses, which gevent only supports from the main loop.
+EXTRACTION_POOL = ProcessPoolExecutor(
+    max_workers=Config.EXTRACTION_PROCESSES, mp_context=multiprocessing.get_context('spawn')
+) if Config.EXTRACTION_PROCESSES > 0 else None
+
+STALE_JOB_MESSAGE = 'Processing was interrupted. Please try again.'
+
+
+def processing_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=Config.PROCESSING_TIMEOUT)
+
+
+def is_stale(status: str, created_at: datetime) -> bool:
+    """Whether a row is still 'processing' long after its job should have finished.
+
+    Jobs only live in the worker's executor, so one lost to a restart or deploy
+    would otherwise leave its row processing forever.
+    """
+    return status == 'processing' and created_at < processing_cutoff()
+
+
+def fail_stale(model, *criteria) -> None:
+    """Mark the model's stale 'processing' rows matching criteria as failed, so they can be retried."""
+    db.session.execute(
+        update(model).where(
+            model.status == 'processing', model.created_at < processing_cutoff(), *criteria
+        ).values(status='failed', error_message=STALE_JOB_MESSAGE)
+    )
+    db.session.commit()
+
+
+def extract_upload_text(upload: BinaryIO, mime_type: str) -> str:
+    """Extract an upload's text, in the extraction pool when one is configured."""
+    path = getattr(upload, 'name', None)
+    if EXTRACTION_POOL is None or not isinstance(path, str):
+        return extract_text_from_file(upload, mime_type)
+    return EXTRACTION_POOL.submit(extract_text_from_path, path, mime_type).result()
+
+
+def extract_resume_text(app, resume_id: str, upload: BinaryIO, mime_type: str) -> None:
+    """Extract text for an uploaded resume and mark it ready or failed."""
+    with app.app_context(), upload:
+        resume = db.session.get(Resume, resume_id)
+        if resume is None:
+            return
+        try:
+            extracted_text = extract_upload_text(upload, mime_type)
+            if not extracted_text or len(extracted_text.strip()) < 50:
+                resume.status = 'failed'
+                resume.error_message = 'Could not extract sufficient text from the file.'
+            else:
+                resume.store_text(extracted_text)
+                resume.text_hash = text_fingerprint(extracted_text)
+                resume.status = 'ready'
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            resume.status = 'failed'
+            resume.error_message = f'Error processing file: {str(e)}'
+            db.session.commit()
+        finally:
+            db.session.remove()
+
+
+def submit_extraction(app, resume_id: str, upload: BinaryIO, mime_type: str):
+    return executor.submit(extract_resume_text, app, resume_id, upload, mime_type)
+
+
+def run_resume_analysis(app, analysis_id: str, resume_text: str) -> None:
+    """Run the Gemini analysis for a pending analysis row and mark it ready or failed."""
+    with app.app_context():
+        try:
+            result = analyze_resume(resume_text)
+            analysis = db.session.get(Analysis, analysis_id)
+            if analysis is None:
+                return
+            analysis.completeness_score = result['completenessScore']
+            analysis.completeness_rationale = result['completenessRationale']
+            analysis.section_scores = result['sectionScores']
+            analysis.suggestions = result['suggestions']
+            analysis.status = 'ready'
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            analysis = db.session.get(Analysis, analysis_id)
+            if analysis is not None:
+                analysis.status = 'failed'
+                analysis.error_message = f'Error analyzing resume: {str(e)}'
+                db.session.commit()
+        finally:
+            db.session.remove()
+
+
+def submit_analysis(app, analysis_id: str, resume_text: str):
+    return executor.submit(run_resume_analysis, app, analysis_id, resume_text)
+
+
+def run_career_roadmap(app, roadmap_id: str, resume_text: str, dream_role: str,
+                       dream_location: str, timeframe: str) -> None:
+    """Generate the roadmap for a pending roadmap row and mark it ready or failed."""
+    with app.app_context():
+        try:
+            result = generate_career_roadmap(resume_text, dream_role, dream_location, timeframe)
+            roadmap = db.session.get(CareerRoadmap, roadmap_id)
+            if roadmap is None:
+                return
+            roadmap.current_gaps = result['currentGaps']
+            roadmap.skills_to_acquire = result['skillsToAcquire']
+            roadmap.action_plan = result['actionPlan']
+            roadmap.resources = result['resources']
+            roadmap.milestones = result['milestones']
+            roadmap.status = 'ready'
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            roadmap = db.session.get(CareerRoadmap, roadmap_id)
+            if roadmap is not None:
+                roadmap.status = 'failed'
+                roadmap.error_message = f'Error generating roadmap: {str(e)}'
+                db.session.commit()
+        finally:
+            db.session.remove()
+
+
+def submit_roadmap(app, roadmap_id: str, resume_text: str, dream_role: str,
+                   dream_location: str, timeframe: str):
+    return executor.submit(run_career_roadmap, app, roadmap_id, resume_text,
+                           dream_role, dream_location, timeframe)
@@ -0,0 +1,309 @@
+"""Bring a database created by db.create_all() up to the current models
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+
+create_all() only creates missing tables and never alters existing ones, so
+databases from before this revision lack the status, hash, storage and PDF
+columns, the relaxed NOT NULLs, the narrowed varchars, the indexes and the
+native UUID ids. Each step inspects the live schema and only applies what is
+missing, so this runs the same on an old database, on one create_all() has
+already built, and on an empty one.
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+MAX_USERNAME_LENGTH = 64
+
+
+def _id_column(name='id'):
+    return sa.Column(name, sa.Uuid(as_uuid=False), primary_key=True)
+
+
+def _create_table(name):
+    """Create one table as the models defined it at this revision."""
+    if name == 'users':
+        op.create_table(
+            'users',
+            _id_column(),
+            sa.Column('username', sa.String(MAX_USERNAME_LENGTH), nullable=False, unique=True),
+            sa.Column('password_hash', sa.Text(), nullable=True),
+        )
+    elif name == 'resumes':
+        op.create_table(
+            'resumes',
+            _id_column(),
+            sa.Column('user_id', sa.Uuid(as_uuid=False), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('filename', sa.Text(), nullable=False),
+            sa.Column('filesize', sa.Integer(), nullable=False),
+            sa.Column('mime_type', sa.String(96), nullable=False),
+            sa.Column('extracted_text', sa.Text(), nullable=True),
+            sa.Column('text_path', sa.Text(), nullable=True),
+            sa.Column('text_hash', sa.String(64), nullable=True),
+            sa.Column('file_hash', sa.String(64), nullable=True),
+            sa.Column('status', sa.Text(), nullable=False),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        )
+    elif name == 'analyses':
+        op.create_table(
+            'analyses',
+            _id_column(),
+            sa.Column('resume_id', sa.Uuid(as_uuid=False), sa.ForeignKey('resumes.id'), nullable=False),
+            sa.Column('completeness_score', sa.Integer(), nullable=True),
+            sa.Column('completeness_rationale', sa.Text(), nullable=True),
+            sa.Column('section_scores', sa.JSON(), nullable=True),
+            sa.Column('suggestions', sa.JSON(), nullable=True),
+            sa.Column('status', sa.Text(), nullable=False),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        )
+    elif name == 'job_matches':
+        op.create_table(
+            'job_matches',
+            _id_column(),
+            sa.Column('resume_id', sa.Uuid(as_uuid=False), sa.ForeignKey('resumes.id'), nullable=False),
+            sa.Column('job_description', sa.Text(), nullable=False),
+            sa.Column('job_role', sa.Text(), nullable=True),
+            sa.Column('job_location', sa.Text(), nullable=True),
+            sa.Column('alignment_score', sa.Integer(), nullable=False),
+            sa.Column('alignment_rationale', sa.Text(), nullable=False),
+            sa.Column('gaps', sa.JSON(), nullable=False),
+            sa.Column('strengths', sa.JSON(), nullable=False),
+            sa.Column('gap_responses', sa.JSON(), nullable=True),
+            sa.Column('final_verdict', sa.Text(), nullable=True),
+            sa.Column('should_apply', sa.Boolean(), nullable=True),
+            sa.Column('changes_summary', sa.Text(), nullable=True),
+            sa.Column('tailored_resume_content', sa.Text(), nullable=True),
+            sa.Column('pdf_path', sa.Text(), nullable=True),
+            sa.Column('pdf_filename', sa.Text(), nullable=True),
+            sa.Column('pdf_etag', sa.String(64), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        )
+    elif name == 'career_roadmaps':
+        op.create_table(
+            'career_roadmaps',
+            _id_column(),
+            sa.Column('user_id', sa.Uuid(as_uuid=False), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('resume_id', sa.Uuid(as_uuid=False), sa.ForeignKey('resumes.id'), nullable=False),
+            sa.Column('dream_role', sa.Text(), nullable=False),
+            sa.Column('dream_location', sa.Text(), nullable=False),
+            sa.Column('timeframe', sa.Text(), nullable=False),
+            sa.Column('current_gaps', sa.JSON(), nullable=True),
+            sa.Column('skills_to_acquire', sa.JSON(), nullable=True),
+            sa.Column('action_plan', sa.JSON(), nullable=True),
+            sa.Column('resources', sa.JSON(), nullable=True),
+            sa.Column('milestones', sa.JSON(), nullable=True),
+            sa.Column('status', sa.Text(), nullable=False),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        )
+    elif name == 'curated_jobs':
+        op.create_table(
+            'curated_jobs',
+            _id_column(),
+            sa.Column('role_key', sa.Text(), nullable=False),
+            sa.Column('location_key', sa.Text(), nullable=False),
+            sa.Column('job_description', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.UniqueConstraint('role_key', 'location_key', name='uq_curatedjob_role_location'),
+        )
+
+
+# In foreign-key order
+TABLES = ['users', 'curated_jobs', 'resumes', 'analyses', 'job_matches', 'career_roadmaps']
+
+
+def _new_columns():
+    return {
+        'resumes': [
+            sa.Column('text_path', sa.Text(), nullable=True),
+            sa.Column('text_hash', sa.String(64), nullable=True),
+            sa.Column('file_hash', sa.String(64), nullable=True),
+            sa.Column('status', sa.Text(), nullable=False, server_default='ready'),
+            sa.Column('error_message', sa.Text(), nullable=True),
+        ],
+        'analyses': [
+            sa.Column('status', sa.Text(), nullable=False, server_default='ready'),
+            sa.Column('error_message', sa.Text(), nullable=True),
+        ],
+        'job_matches': [
+            sa.Column('pdf_path', sa.Text(), nullable=True),
+            sa.Column('pdf_filename', sa.Text(), nullable=True),
+            sa.Column('pdf_etag', sa.String(64), nullable=True),
+        ],
+        'career_roadmaps': [
+            sa.Column('status', sa.Text(), nullable=False, server_default='ready'),
+            sa.Column('error_message', sa.Text(), nullable=True),
+        ],
+    }
+
+
+NOW_NULLABLE = {
+    'resumes': ['extracted_text'],
+    'analyses': ['completeness_score', 'completeness_rationale', 'section_scores', 'suggestions'],
+    'career_roadmaps': ['current_gaps', 'skills_to_acquire', 'action_plan', 'resources', 'milestones'],
+}
+
+NARROWED = {
+    'users': {'username': MAX_USERNAME_LENGTH},
+    'resumes': {'mime_type': 96},
+}
+
+UUID_COLUMNS = {
+    'users': ['id'],
+    'resumes': ['id', 'user_id'],
+    'analyses': ['id', 'resume_id'],
+    'job_matches': ['id', 'resume_id'],
+    'career_roadmaps': ['id', 'user_id', 'resume_id'],
+    'curated_jobs': ['id'],
+}
+
+INDEXES = [
+    ('ix_resume_user_created', 'resumes', ['user_id', 'created_at']),
+    ('ix_resume_user_text_hash', 'resumes', ['user_id', 'text_hash']),
+    ('ix_resume_user_file_hash', 'resumes', ['user_id', 'file_hash']),
+    ('ix_analysis_resume_id', 'analyses', ['resume_id']),
+    ('ix_jobmatch_resume_id', 'job_matches', ['resume_id']),
+    ('ix_careerroadmap_user_created', 'career_roadmaps', ['user_id', 'created_at']),
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    native_uuid = bind.dialect.name == 'postgresql'
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    columns = {
+        table: {column['name']: column for column in inspector.get_columns(table)}
+        for table in tables
+    }
+
+    # Refuse to narrow over values that don't fit rather than truncate them
+    for table, lengths in NARROWED.items():
+        for name, length in lengths.items():
+            if table not in tables:
+                continue
+            too_long = bind.execute(sa.text(
+                f'SELECT count(*) FROM {table} WHERE length({name}) > {length}'
+            )).scalar()
+            if too_long:
+                raise RuntimeError(
+                    f'{too_long} row(s) in {table}.{name} are longer than {length} characters; '
+                    'shorten them before upgrading'
+                )
+
+    to_uuid = {
+        table: [name for name in names if not _is_uuid(columns[table][name]['type'], native_uuid)]
+        for table, names in UUID_COLUMNS.items() if table in tables
+    }
+    # PostgreSQL won't change the type of a key column other keys still reference
+    dropped_fks = []
+    if native_uuid and any(to_uuid.values()):
+        for table in UUID_COLUMNS:
+            if table not in tables:
+                continue
+            for fk in inspector.get_foreign_keys(table):
+                if fk['referred_table'] in UUID_COLUMNS:
+                    op.drop_constraint(fk['name'], table, type_='foreignkey')
+                    dropped_fks.append((table, fk))
+    elif any(to_uuid.values()):
+        # Without a native type Uuid stores the 32 hex digits, so dashed ids stop matching
+        for table, names in to_uuid.items():
+            for name in names:
+                op.execute(f"UPDATE {table} SET {name} = replace({name}, '-', '') WHERE {name} LIKE '%-%'")
+
+    new_columns = _new_columns()
+    for table in TABLES:
+        if table not in tables:
+            continue
+        existing = columns[table]
+        added = [column for column in new_columns.get(table, []) if column.name not in existing]
+        with op.batch_alter_table(table) as batch:
+            for column in added:
+                batch.add_column(column)
+            for name in NOW_NULLABLE.get(table, []):
+                if not existing[name]['nullable']:
+                    batch.alter_column(name, existing_type=existing[name]['type'], nullable=True)
+            for name, length in NARROWED.get(table, {}).items():
+                if getattr(existing[name]['type'], 'length', None) != length:
+                    batch.alter_column(name, existing_type=existing[name]['type'], type_=sa.String(length))
+            for name in to_uuid[table]:
+                if native_uuid:
+                    # A varchar default such as gen_random_uuid()::varchar can't be cast;
+                    # ids are generated in Python anyway
+                    batch.alter_column(
+                        name, existing_type=existing[name]['type'], server_default=None,
+                        type_=sa.Uuid(as_uuid=False), postgresql_using=f'{name}::uuid',
+                    )
+                else:
+                    batch.alter_column(name, existing_type=existing[name]['type'], type_=sa.Uuid(as_uuid=False))
+        # The server default only backfills existing rows; the models set status themselves
+        backfilled = [column for column in added if column.server_default is not None]
+        if backfilled:
+            with op.batch_alter_table(table) as batch:
+                for column in backfilled:
+                    batch.alter_column(column.name, existing_type=column.type, server_default=None)
+
+    for table, fk in dropped_fks:
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'],
+            fk['constrained_columns'], fk['referred_columns'],
+            **fk.get('options', {}),
+        )
+
+    # curated_jobs on an existing database, or every table on an empty one
+    for table in TABLES:
+        if table not in tables:
+            _create_table(table)
+
+    inspector = sa.inspect(bind)
+    for name, table, index_columns in INDEXES:
+        if name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, index_columns)
+
+
+def downgrade():
+    """Drop what upgrade() added.
+
+    The UUID casts, narrowed varchars and relaxed NOT NULLs are one-way and stay
+    as they are. Resumes whose text lives only in text_path lose it, so back up
+    storage/resumes before downgrading.
+    """
+    logger.warning('Keeping UUID ids, narrowed varchars and nullable columns; only added columns, '
+                   'indexes and curated_jobs are dropped')
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for name, table, _ in INDEXES:
+        if table in tables and name in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
+
+    for table, added in _new_columns().items():
+        if table not in tables:
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        with op.batch_alter_table(table) as batch:
+            for column in added:
+                if column.name in existing:
+                    batch.drop_column(column.name)
+
+    if 'curated_jobs' in tables:
+        op.drop_table('curated_jobs')
+
+
+def _is_uuid(column_type, native_uuid):
+    if native_uuid:
+        return isinstance(column_type, sa.Uuid)
+    return isinstance(column_type, sa.CHAR) and column_type.length == 32
@@ -1,65 +1,208 @@
-from PyPDF2 import PdfReader
 from docx import Document
+from lxml import etree
+import pymupdf
 import pytesseract
 from PIL import Image
+import hashlib
 import io
+import os
+import subprocess
+import tempfile
+import zipfile
+from typing import BinaryIO, Dict, List, Tuple, Union
 
+# Pages whose text layer is shorter than this (nothing, or a stray page number or
+# header) are treated as scanned and OCR'd
+OCR_MIN_PAGE_CHARS = 20
+OCR_DPI = 200
+OCR_TIMEOUT = 120
+OCR_PROCESSES = os.cpu_count() or 1
 
-def extract_text_from_pdf(file_content: bytes) -> str:
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def spool_upload(stream: BinaryIO) -> Tuple[BinaryIO, int, str]:
+    """Copy an upload stream into a temp file, returning it with its size and SHA-256.
+    
+    The file has a path, so extractors can open it in place instead of reading it
+    into memory. It is deleted when closed.
+    """
+    spooled = tempfile.NamedTemporaryFile(prefix="resumatch-upload-")
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b''):
+        spooled.write(chunk)
+        digest.update(chunk)
+        size += len(chunk)
+    spooled.seek(0)
+    return spooled, size, digest.hexdigest()
+
+
+def extract_text_from_pdf(file: BinaryIO) -> str:
     try:
-        pdf_reader = PdfReader(io.BytesIO(file_content))
-        text_parts = []
-        for page in pdf_reader.pages:
-            text = page.extract_text()
-            if text:
-                text_parts.append(text)
-        return "\n".join(text_parts)
+        # A file on disk is opened by path, so MuPDF reads it on demand rather than
+        # from a copy of the whole upload in memory
+        path = getattr(file, "name", None)
+        if isinstance(path, str) and os.path.isfile(path):
+            doc = pymupdf.open(path, filetype="pdf")
+        else:
+            doc = pymupdf.open(stream=file.read(), filetype="pdf")
+        
+        # One parsed document serves both the text layer and any OCR rendering
+        with doc:
+            page_texts = [page.get_text() for page in doc]
+            
+            # Born-digital pages come straight from the text layer; only pages without
+            # one (scans, images of text) pay for rendering and OCR
+            scanned_pages = [i for i, text in enumerate(page_texts) if len(text.strip()) < OCR_MIN_PAGE_CHARS]
+            if scanned_pages:
+                for i, text in ocr_pdf_pages(doc, scanned_pages).items():
+                    # Embedded text is exact, so OCR only replaces it when it reads more
+                    if len(text) > len(page_texts[i].strip()):
+                        page_texts[i] = text
+        
+        return "\n".join(text for text in page_texts if text)
     except Exception as e:
         raise ValueError(f"Failed to extract text from PDF: {str(e)}")
 
 
-def extract_text_from_docx(file_content: bytes) -> str:
+def ocr_pdf_pages(doc, page_numbers: List[int]) -> Dict[int, str]:
+    """OCR the given pages of an open PDF, returning {page_number: text}.
+    
+    Tesseract start-up dominates on resume-sized pages, so the pages are rendered to
+    PNGs and passed as image lists rather than OCR'd one process at a time. With
+    several pages the lists are split across up to OCR_PROCESSES Tesseract runs
+    working in parallel. Tesseract ends each page with a form feed, which maps the
+    output back to page numbers. Returns {} if any run fails, leaving the text
+    layer in place.
+    """
+    runs = min(len(page_numbers), OCR_PROCESSES)
+    batch_size = -(-len(page_numbers) // runs)
+    batches = [page_numbers[start:start + batch_size] for start in range(0, len(page_numbers), batch_size)]
+    env = dict(os.environ)
+    if len(batches) > 1:
+        # Each run already has a core to itself; Tesseract's own threading would oversubscribe
+        env["OMP_THREAD_LIMIT"] = "1"
+    
+    processes = []
     try:
-        doc = Document(io.BytesIO(file_content))
-        text_parts = []
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text_parts.append(paragraph.text)
-        return "\n".join(text_parts)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for n, batch in enumerate(batches):
+                image_paths = []
+                for i in batch:
+                    image_path = os.path.join(tmp_dir, f"page-{i}.png")
+                    doc[i].get_pixmap(dpi=OCR_DPI).save(image_path)
+                    image_paths.append(image_path)
+                list_path = os.path.join(tmp_dir, f"pages-{n}.txt")
+                with open(list_path, "w") as f:
+                    f.write("\n".join(image_paths) + "\n")
+                processes.append(subprocess.Popen(
+                    [pytesseract.pytesseract.tesseract_cmd, list_path, "stdout", "-l", "eng"],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env
+                ))
+            
+            texts = {}
+            for batch, process in zip(batches, processes):
+                stdout, _ = process.communicate(timeout=OCR_TIMEOUT)
+                if process.returncode != 0:
+                    return {}
+                page_outputs = stdout.decode("utf-8", errors="replace").split("\f")
+                texts.update((i, text.strip()) for i, text in zip(batch, page_outputs))
+            return texts
+    except Exception:
+        return {}
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_NAMESPACES = {'w': _W[1:-1]}
+_DOCX_PARAGRAPHS = etree.XPath('/w:document/w:body/w:p', namespaces=_W_NAMESPACES)
+_DOCX_RUN_CONTENT = etree.XPath('(w:r | w:hyperlink/w:r)/*', namespaces=_W_NAMESPACES)
+_DOCX_RUN_TEXT = {_W + 'tab': '\t', _W + 'ptab': '\t', _W + 'cr': '\n', _W + 'noBreakHyphen': '-'}
+_DOCX_XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+
+
+def _docx_paragraph_text(paragraph) -> str:
+    # Mirrors python-docx's Paragraph.text for the run content it understands
+    parts = []
+    for element in _DOCX_RUN_CONTENT(paragraph):
+        tag = element.tag
+        if tag == _W + 't':
+            parts.append(element.text or '')
+        elif tag == _W + 'br':
+            if element.get(_W + 'type', 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        else:
+            parts.append(_DOCX_RUN_TEXT.get(tag, ''))
+    return ''.join(parts)
+
+
+def extract_text_from_docx(file: BinaryIO) -> str:
+    try:
+        # Reading the body XML directly skips building python-docx's object model;
+        # documents whose main part lives elsewhere fall back to python-docx
+        try:
+            with zipfile.ZipFile(file) as archive, archive.open('word/document.xml') as document_xml:
+                tree = etree.parse(document_xml, _DOCX_XML_PARSER)
+        except KeyError:
+            file.seek(0)
+            paragraphs = (paragraph.text for paragraph in Document(file).paragraphs)
+        else:
+            paragraphs = (_docx_paragraph_text(paragraph) for paragraph in _DOCX_PARAGRAPHS(tree))
+        return "\n".join(text for text in paragraphs if text.strip())
     except Exception as e:
         raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
 
 
-def extract_text_from_image(file_content: bytes) -> str:
+def extract_text_from_image(file: BinaryIO) -> str:
     try:
-        image = Image.open(io.BytesIO(file_content))
+        image = Image.open(file)
         text = pytesseract.image_to_string(image)
         return text.strip()
     except Exception as e:
         raise ValueError(f"Failed to extract text from image: {str(e)}")
 
 
-def extract_text_from_file(file_content: bytes, mime_type: str) -> str:
+def extract_text_from_file(file: Union[bytes, BinaryIO], mime_type: str) -> str:
+    if isinstance(file, bytes):
+        file = io.BytesIO(file)
     if mime_type == "application/pdf":
-        return extract_text_from_pdf(file_content)
+        return extract_text_from_pdf(file)
     elif mime_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        return extract_text_from_docx(file_content)
+        return extract_text_from_docx(file)
     elif mime_type in ["image/png", "image/jpeg"]:
-        return extract_text_from_image(file_content)
+        return extract_text_from_image(file)
     elif mime_type == "text/plain":
-        return file_content.decode("utf-8")
+        return file.read().decode("utf-8")
     else:
         raise ValueError(f"Unsupported file type: {mime_type}")
 
 
+def extract_text_from_path(path: str, mime_type: str) -> str:
+    """Same as extract_text_from_file for a file on disk, e.g. from a worker process."""
+    with open(path, "rb") as file:
+        return extract_text_from_file(file, mime_type)
+
+
+def text_fingerprint(text: str) -> str:
+    """Hash extracted text so re-uploads of the same resume can be recognized."""
+    return hashlib.sha256(text.strip().lower().encode("utf-8")).hexdigest()
+
+
+MIME_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'txt': 'text/plain'
+}
+
+
 def get_mime_type(filename: str) -> str:
     ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
-    mime_map = {
-        'pdf': 'application/pdf',
-        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'png': 'image/png',
-        'jpg': 'image/jpeg',
-        'jpeg': 'image/jpeg',
-        'txt': 'text/plain'
-    }
-    return mime_map.get(ext, 'application/octet-stream')
+    return MIME_TYPES.get(ext, 'application/octet-stream')
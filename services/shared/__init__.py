@@ -1,2 +1,2 @@
 from .config import Config
-from .models import db, User, Resume, Analysis, JobMatch, CareerRoadmap
+from .models import db, User, Resume, Analysis, JobMatch, CareerRoadmap, CuratedJob
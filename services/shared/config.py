@@ -7,8 +7,25 @@ class Config:
     DATABASE_URL = os.getenv("DATABASE_URL")
     SECRET_KEY = os.getenv("SESSION_SECRET", "your-secret-key-change-in-production")
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+    REDIS_URL = os.getenv("REDIS_URL")
     
     MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+    MAX_USERNAME_LENGTH = 64
+    AUTH_RATE_LIMIT = os.getenv("AUTH_RATE_LIMIT", "10 per minute")
+    LOGIN_ATTEMPT_RATE_LIMIT = os.getenv("LOGIN_ATTEMPT_RATE_LIMIT", "5 per minute")
+    TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", "0"))
+    BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "4"))
+    PROCESSING_TIMEOUT = int(os.getenv("PROCESSING_TIMEOUT", str(10 * 60)))
+    CURATED_JOB_TTL = 24 * 60 * 60
+    PAGE_CACHE_TTL = 60 * 60
+    STORAGE_DIR = os.getenv("STORAGE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "storage"))
+    TAILORED_PDF_DIR = os.path.join(STORAGE_DIR, "tailored")
+    RESUME_TEXT_DIR = os.path.join(STORAGE_DIR, "resumes")
+    JINJA_CACHE_DIR = os.path.join(STORAGE_DIR, "jinja")
+    PDF_RENDERER = os.getenv("PDF_RENDERER", "canvas")
+    PDF_PROCESSES = int(os.getenv("PDF_PROCESSES", "0"))
+    EXTRACTION_PROCESSES = int(os.getenv("EXTRACTION_PROCESSES", "2"))
+    SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "100"))
     ALLOWED_EXTENSIONS = {'pdf', 'docx', 'png', 'jpg', 'jpeg', 'txt'}
     
     @staticmethod
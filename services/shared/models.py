@@ -1,8 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import deferred
 from datetime import datetime
+import os
 import uuid
 
-db = SQLAlchemy()
+from shared.config import Config
+
+# Writes are flushed by each route's single commit; nothing reads its own pending rows
+db = SQLAlchemy(session_options={'autoflush': False})
 
 def generate_uuid():
     return str(uuid.uuid4())
@@ -10,43 +15,88 @@ def generate_uuid():
 class User(db.Model):
     __tablename__ = 'users'
     
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    username = db.Column(db.Text, unique=True, nullable=False)
+    id = db.Column(db.Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
+    username = db.Column(db.String(Config.MAX_USERNAME_LENGTH), unique=True, nullable=False)
     password_hash = db.Column(db.Text, nullable=True)
     
-    resumes = db.relationship('Resume', backref='user', lazy=True, cascade='all, delete-orphan')
-    career_roadmaps = db.relationship('CareerRoadmap', backref='user', lazy=True, cascade='all, delete-orphan')
+    resumes = db.relationship('Resume', back_populates='user', lazy=True, cascade='all, delete-orphan')
+    career_roadmaps = db.relationship('CareerRoadmap', back_populates='user', lazy=True, cascade='all, delete-orphan')
 
 class Resume(db.Model):
     __tablename__ = 'resumes'
+    __table_args__ = (
+        db.Index('ix_resume_user_created', 'user_id', 'created_at'),
+        db.Index('ix_resume_user_text_hash', 'user_id', 'text_hash'),
+        db.Index('ix_resume_user_file_hash', 'user_id', 'file_hash'),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    id = db.Column(db.Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
+    user_id = db.Column(db.Uuid(as_uuid=False), db.ForeignKey('users.id'), nullable=False)
     filename = db.Column(db.Text, nullable=False)
     filesize = db.Column(db.Integer, nullable=False)
-    mime_type = db.Column(db.Text, nullable=False)
-    extracted_text = db.Column(db.Text, nullable=False)
+    mime_type = db.Column(db.String(96), nullable=False)
+    # Legacy rows keep their text inline; new ones store it in a file at text_path
+    extracted_text = deferred(db.Column(db.Text, nullable=True))
+    text_path = db.Column(db.Text, nullable=True)
+    text_hash = db.Column(db.String(64), nullable=True)
+    file_hash = db.Column(db.String(64), nullable=True)
+    status = db.Column(db.Text, nullable=False, default='ready')
+    error_message = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    analyses = db.relationship('Analysis', backref='resume', lazy=True, cascade='all, delete-orphan')
-    job_matches = db.relationship('JobMatch', backref='resume', lazy=True, cascade='all, delete-orphan')
+    # Declared on both sides so Analysis.resume and JobMatch.resume exist as soon as the
+    # models are imported; fetch_owned eager-loads them before any query configures mappers
+    user = db.relationship('User', back_populates='resumes')
+    analyses = db.relationship('Analysis', back_populates='resume', lazy=True, cascade='all, delete-orphan')
+    job_matches = db.relationship('JobMatch', back_populates='resume', lazy=True, cascade='all, delete-orphan')
+    
+    def store_text(self, text):
+        """Write the extracted text to storage and point the resume at it."""
+        os.makedirs(Config.RESUME_TEXT_DIR, exist_ok=True)
+        path = os.path.join(Config.RESUME_TEXT_DIR, f'{self.id}.txt')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        self.text_path = path
+        self._text = text
+    
+    def load_text(self):
+        """Return the extracted text, reading it at most once per loaded resume."""
+        if getattr(self, '_text', None) is None:
+            if self.text_path:
+                with open(self.text_path, encoding='utf-8') as f:
+                    self._text = f.read()
+            else:
+                self._text = self.extracted_text
+        return self._text
 
 class Analysis(db.Model):
     __tablename__ = 'analyses'
+    __table_args__ = (
+        db.Index('ix_analysis_resume_id', 'resume_id'),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    resume_id = db.Column(db.String(36), db.ForeignKey('resumes.id'), nullable=False)
-    completeness_score = db.Column(db.Integer, nullable=False)
-    completeness_rationale = db.Column(db.Text, nullable=False)
-    section_scores = db.Column(db.JSON, nullable=False)
-    suggestions = db.Column(db.JSON, nullable=False)
+    id = db.Column(db.Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
+    resume_id = db.Column(db.Uuid(as_uuid=False), db.ForeignKey('resumes.id'), nullable=False)
+    completeness_score = db.Column(db.Integer, nullable=True)
+    completeness_rationale = db.Column(db.Text, nullable=True)
+    section_scores = db.Column(db.JSON, nullable=True)
+    suggestions = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.Text, nullable=False, default='ready')
+    error_message = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    resume = db.relationship('Resume', back_populates='analyses')
 
 class JobMatch(db.Model):
     __tablename__ = 'job_matches'
+    __table_args__ = (
+        db.Index('ix_jobmatch_resume_id', 'resume_id'),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    resume_id = db.Column(db.String(36), db.ForeignKey('resumes.id'), nullable=False)
+    id = db.Column(db.Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
+    resume_id = db.Column(db.Uuid(as_uuid=False), db.ForeignKey('resumes.id'), nullable=False)
     job_description = db.Column(db.Text, nullable=False)
     job_role = db.Column(db.Text, nullable=True)
     job_location = db.Column(db.Text, nullable=True)
@@ -59,20 +109,44 @@ class JobMatch(db.Model):
     should_apply = db.Column(db.Boolean, nullable=True)
     changes_summary = db.Column(db.Text, nullable=True)
     tailored_resume_content = db.Column(db.Text, nullable=True)
+    pdf_path = db.Column(db.Text, nullable=True)
+    pdf_filename = db.Column(db.Text, nullable=True)
+    pdf_etag = db.Column(db.String(64), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    resume = db.relationship('Resume', back_populates='job_matches')
 
 class CareerRoadmap(db.Model):
     __tablename__ = 'career_roadmaps'
+    __table_args__ = (
+        db.Index('ix_careerroadmap_user_created', 'user_id', 'created_at'),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
-    resume_id = db.Column(db.String(36), db.ForeignKey('resumes.id'), nullable=False)
+    id = db.Column(db.Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
+    user_id = db.Column(db.Uuid(as_uuid=False), db.ForeignKey('users.id'), nullable=False)
+    resume_id = db.Column(db.Uuid(as_uuid=False), db.ForeignKey('resumes.id'), nullable=False)
     dream_role = db.Column(db.Text, nullable=False)
     dream_location = db.Column(db.Text, nullable=False)
     timeframe = db.Column(db.Text, nullable=False)
-    current_gaps = db.Column(db.JSON, nullable=False)
-    skills_to_acquire = db.Column(db.JSON, nullable=False)
-    action_plan = db.Column(db.JSON, nullable=False)
-    resources = db.Column(db.JSON, nullable=False)
-    milestones = db.Column(db.JSON, nullable=False)
+    current_gaps = db.Column(db.JSON, nullable=True)
+    skills_to_acquire = db.Column(db.JSON, nullable=True)
+    action_plan = db.Column(db.JSON, nullable=True)
+    resources = db.Column(db.JSON, nullable=True)
+    milestones = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.Text, nullable=False, default='ready')
+    error_message = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    user = db.relationship('User', back_populates='career_roadmaps')
+
+class CuratedJob(db.Model):
+    __tablename__ = 'curated_jobs'
+    __table_args__ = (
+        db.UniqueConstraint('role_key', 'location_key', name='uq_curatedjob_role_location'),
+    )
+    
+    id = db.Column(db.Uuid(as_uuid=False), primary_key=True, default=generate_uuid)
+    role_key = db.Column(db.Text, nullable=False)
+    location_key = db.Column(db.Text, nullable=False)
+    job_description = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
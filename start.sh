@@ -1,3 +1,4 @@
 #!/bin/bash
-# Start the Flask microservices application
-exec python run.py
+# Start the Flask microservices application (services/gateway) under gunicorn
+# with gevent workers; see gunicorn_conf.py. Set PORT and WEB_CONCURRENCY to override.
+exec gunicorn -c gunicorn_conf.py
@@ -0,0 +1,155 @@
+import io
+import os
+import zipfile
+
+import docx
+from docx.enum.text import WD_BREAK
+from docx.opc.constants import RELATIONSHIP_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+import pymupdf
+import pytest
+
+from resume_service import file_processor
+
+
+def _sample_docx():
+    document = docx.Document()
+    document.add_heading('Jane Doe', level=1)
+    document.add_paragraph('Data Scientist | jane@example.com')
+    document.add_paragraph('')
+    document.add_paragraph('   ')
+
+    mixed = document.add_paragraph('Skills:')
+    mixed.add_run('\tPython').bold = True
+    mixed.add_run(', SQL')
+    run = mixed.add_run('Line one')
+    run.add_break()
+    run.add_text('line two')
+    run.add_break(WD_BREAK.PAGE)
+    run.add_text('after the page break')
+    for tag in ('w:cr', 'w:noBreakHyphen', 'w:ptab'):
+        run._r.append(OxmlElement(tag))
+    run.add_text('end')
+
+    linked = document.add_paragraph('Portfolio: ')
+    hyperlink = OxmlElement('w:hyperlink')
+    hyperlink.set(qn('r:id'), linked.part.relate_to(
+        'https://example.com', RELATIONSHIP_TYPE.HYPERLINK, is_external=True
+    ))
+    link_run = OxmlElement('w:r')
+    link_text = OxmlElement('w:t')
+    link_text.text = 'example.com'
+    link_run.append(link_text)
+    hyperlink.append(link_run)
+    linked._p.append(hyperlink)
+
+    document.add_table(rows=1, cols=1).cell(0, 0).text = 'table text'
+    document.add_paragraph('• Shipped things')
+
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def _python_docx_text(data):
+    paragraphs = docx.Document(io.BytesIO(data)).paragraphs
+    return "\n".join(paragraph.text for paragraph in paragraphs if paragraph.text.strip())
+
+
+def test_docx_reader_matches_python_docx():
+    data = _sample_docx()
+
+    text = file_processor.extract_text_from_docx(io.BytesIO(data))
+
+    assert text == _python_docx_text(data)
+    assert 'example.com' in text
+    assert '\tPython' in text
+
+
+def test_docx_reader_falls_back_when_main_part_is_renamed():
+    # The main document part may live anywhere the package relationships point to
+    renamed = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(_sample_docx())) as source, zipfile.ZipFile(renamed, 'w') as target:
+        for item in source.infolist():
+            content = source.read(item.filename)
+            name = item.filename
+            if name == 'word/document.xml':
+                name = 'word/main.xml'
+            elif name == 'word/_rels/document.xml.rels':
+                name = 'word/_rels/main.xml.rels'
+            elif name in ('[Content_Types].xml', '_rels/.rels'):
+                content = content.replace(b'document.xml', b'main.xml')
+            target.writestr(name, content)
+    data = renamed.getvalue()
+
+    assert file_processor.extract_text_from_docx(io.BytesIO(data)) == _python_docx_text(data)
+
+
+TEXT_LAYER = '\n'.join(['Jane Doe, Data Scientist'] * 6)
+
+
+def _mixed_pdf(scanned_pages):
+    """One born-digital page followed by image-only pages."""
+    doc = pymupdf.open()
+    doc.new_page().insert_text((72, 72), TEXT_LAYER)
+    pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 20, 20), False)
+    pixmap.clear_with(255)
+    for _ in range(scanned_pages):
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=pixmap)
+    return doc.tobytes()
+
+
+@pytest.fixture
+def fake_tesseract(tmp_path, monkeypatch):
+    """Point pytesseract at a script that 'reads' each listed image and logs its runs."""
+    log = tmp_path / 'runs.log'
+    script = tmp_path / 'tesseract'
+    script.write_text(
+        '#!/bin/sh\n'
+        f'echo "${{OMP_THREAD_LIMIT:-unset}}" >> {log}\n'
+        'while read image; do echo "text of $(basename "$image" .png)"; printf "\\f"; done < "$1"\n'
+    )
+    os.chmod(script, 0o755)
+    monkeypatch.setattr(file_processor.pytesseract.pytesseract, 'tesseract_cmd', str(script))
+    return log
+
+
+def test_scanned_pages_are_ocrd_in_one_tesseract_run(fake_tesseract, monkeypatch):
+    monkeypatch.setattr(file_processor, 'OCR_PROCESSES', 1)
+
+    text = file_processor.extract_text_from_pdf(io.BytesIO(_mixed_pdf(3)))
+
+    assert fake_tesseract.read_text().splitlines() == ['unset']
+    assert text.split('\n')[-3:] == ['text of page-1', 'text of page-2', 'text of page-3']
+    assert text.startswith(TEXT_LAYER)
+
+
+def test_scanned_pages_are_split_across_parallel_runs(fake_tesseract, monkeypatch):
+    monkeypatch.setattr(file_processor, 'OCR_PROCESSES', 2)
+
+    text = file_processor.extract_text_from_pdf(io.BytesIO(_mixed_pdf(5)))
+
+    # Each run is limited to one thread so the parallel runs don't oversubscribe
+    assert fake_tesseract.read_text().splitlines() == ['1', '1']
+    assert text.split('\n')[-5:] == [f'text of page-{i}' for i in range(1, 6)]
+
+
+def test_short_text_pages_keep_their_text_layer(fake_tesseract):
+    doc = pymupdf.open(stream=_mixed_pdf(0), filetype='pdf')
+    doc.new_page().insert_text((72, 72), 'References available on request')
+    # Nearly empty: OCR reads more than the stray page number
+    doc.new_page().insert_text((72, 72), '3')
+
+    text = file_processor.extract_text_from_pdf(io.BytesIO(doc.tobytes()))
+
+    assert text.split('\n')[-3:] == ['References available on request', '', 'text of page-2']
+
+
+def test_failed_ocr_keeps_the_text_layer(monkeypatch):
+    monkeypatch.setattr(file_processor.pytesseract.pytesseract, 'tesseract_cmd', '/bin/false')
+
+    text = file_processor.extract_text_from_pdf(io.BytesIO(_mixed_pdf(2)))
+
+    assert text.strip() == TEXT_LAYER.strip()
@@ -0,0 +1,118 @@
+import io
+import json
+from pathlib import Path
+
+import pymupdf
+import pytest
+
+from gateway import pdf
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+SAMPLE_TEXT = (FIXTURES / 'sample_resume.txt').read_text()
+SAMPLE_JSON = (FIXTURES / 'sample_resume.json').read_text()
+
+EDGE_CASE_TEXT = """# **Jane Q. Public**
+Senior Data Scientist | ML Engineer
+jane@example.com | (555) 123-4567 | New York, NY | linkedin.com/in/janeq | github.com/janeq
+kaggle.com/janeq | medium.com/@janeq | Google Scholar
+https://janeq.dev
+
+PROFESSIONAL SUMMARY
+Built LATEX and L ATEX pipelines. Data person.
+TECHNICAL SKILLS
+- Python, SQL
+* Spark
+PROFESSIONAL EXPERIENCE
+Lead DS | Acme | NYC | 2021 – Present
+• Did things
+Analyst | Foo | Boston | Jan 2019 — 2021
+Plain line here
+EDUCATION
+MS Statistics, Columbia University 2012
+BS Math – 2008
+Some other text
+SKILLS, TOOLS
+Excel
+EXPERIENCE NOTES
+Interests here
+INTERESTS
+Chess
+"""
+
+
+def _render(render, elements):
+    out = io.BytesIO()
+    render(elements, out)
+    return pymupdf.open(stream=out.getvalue(), filetype='pdf')
+
+
+def _lines(doc):
+    """Return (page, x, y, text) for each line of words in a rendered PDF."""
+    lines = []
+    for page_number, page in enumerate(doc):
+        words = sorted(page.get_text('words'), key=lambda word: (round(word[3]), word[0]))
+        for word in words:
+            x0, y1, text = word[0], word[3], word[4]
+            if lines and lines[-1][0] == page_number and abs(lines[-1][2] - y1) < 2:
+                lines[-1][3].append(text)
+            else:
+                lines.append((page_number, round(x0, 1), round(y1, 1), [text]))
+    return [(page, x, y, ' '.join(words)) for page, x, y, words in lines]
+
+
+def _links(doc):
+    return [(page_number, link['uri']) for page_number, page in enumerate(doc) for link in page.get_links()]
+
+
+@pytest.mark.parametrize('elements', [
+    pdf.resume_elements_from_text(SAMPLE_TEXT)[0],
+    pdf.resume_elements_from_json(json.loads(SAMPLE_JSON))[0],
+    # Long enough to break across pages
+    pdf.resume_elements_from_text(SAMPLE_TEXT + '\n'.join(f'- Shipped feature number {i}' for i in range(80)))[0],
+], ids=['text', 'json', 'multipage'])
+def test_canvas_renderer_matches_platypus(elements):
+    canvas_doc = _render(pdf.render_resume_pdf_fast, elements)
+    platypus_doc = _render(pdf.render_resume_pdf_platypus, elements)
+
+    assert len(canvas_doc) == len(platypus_doc)
+    canvas_lines = _lines(canvas_doc)
+    platypus_lines = _lines(platypus_doc)
+    assert [(page, y, text) for page, _, y, text in canvas_lines] == \
+        [(page, y, text) for page, _, y, text in platypus_lines]
+    # Centred lines may differ by a fraction of a point in measured width
+    assert [x for _, x, _, _ in canvas_lines] == pytest.approx([x for _, x, _, _ in platypus_lines], abs=0.5)
+    assert _links(canvas_doc) == _links(platypus_doc)
+
+
+def test_unsupported_markup_falls_back_to_platypus():
+    content = SAMPLE_TEXT.replace('Software Engineer', '<i>Software</i> Engineer', 1)
+    assert '<i>Software</i>' in content
+
+    pdf_bytes, _ = pdf.build_tailored_pdf(content)
+    text = ''.join(page.get_text() for page in pymupdf.open(stream=pdf_bytes, filetype='pdf'))
+
+    assert '<i>' not in text
+    assert 'Software Engineer' in text
+
+
+# Output of the two-pass parser the single-pass one replaced
+@pytest.mark.parametrize('name, content', [
+    ('sample', SAMPLE_TEXT),
+    ('edge_cases', EDGE_CASE_TEXT),
+    ('no_sections', 'just a body\nno sections at all\nfoo@bar.com'),
+])
+def test_text_parser_matches_reference_output(name, content):
+    expected = json.loads((FIXTURES / 'resume_text_elements.json').read_text())[name]
+    elements, filename = pdf.resume_elements_from_text(content)
+
+    assert [list(element) for element in elements] == expected[0]
+    assert filename == expected[1]
+
+
+def test_text_parser_keeps_leading_section_with_trailing_words():
+    elements, _ = pdf.resume_elements_from_text(
+        'Jane Doe\njane@x.com\nSKILLS & TOOLS\nPython, SQL\nEXPERIENCE\nDid things'
+    )
+
+    assert ('SectionHeader', 'SKILLS & TOOLS') in elements
+    assert ('ResumeBody', 'Python, SQL') in elements